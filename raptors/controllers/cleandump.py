@@ -4,11 +4,14 @@ from __future__ import division, print_function, absolute_import
 
 import sys
 import os
+import asyncio
 from datetime import datetime
 from raptors.models.readers import EntBookingDumpReader, TechSpec1Reader, SFDCRawDumpReader
 from raptors.models.readers import MasterUniqueNamesReader, MongoReader, SL5ToSegmentsReader
 from raptors.models.writers import Writer, MongoWriter
+from raptors.models.mappingengines import engines
 from raptors.helpers.mongoutils import Mongo
+from raptors.helpers.raptortools import ParsingTool as PT
 from raptors.helpers.exceptions.modelsexceptions import MappingRowsExceededException
 from raptors import __version__
 
@@ -17,7 +20,101 @@ __copyright__ = "Jeyaraj Durairaj"
 __license__ = "none"
 
 
-class CleanBookingDump():
+class CleanDump():
+    """Base of the dump cleaners: reads the dump concurrently with the
+    mapper preparations and writes it cleaned; the cleaners give the
+    reader, writer, mapping engine, comm and trash query, and the ways the
+    dump is read (_read_dump) and cleaned up (_cleanup_data)
+    """
+
+
+    def _write_dump(self):
+        """Writes Cleaned Dump into the new collection, either through
+        a staging collection swapped in at the end or in place
+        """
+        if self.writer.is_staged():
+            self.writer.stage()
+            self.writer.write(self.reader.df)
+            self.writer.promote()
+            return
+        self._expunge_all_existing_data()
+        self.writer.write(self.reader.df)
+        return
+
+    def _read_all(self):
+        """Private method to read and clean up the dump while the mapping
+        engine prepares the Mapping data, on an event loop of its own
+        """
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(self._read_concurrently(loop))
+        finally:
+            loop.run_until_complete(loop.shutdown_default_executor())
+            loop.close()
+        return
+
+    async def _read_concurrently(self, loop):
+        """Runs the mapper preparations and the dump read and cleanup
+        concurrently in the loop's executor; the dump read waits for
+        the mappers only when the engine looks them up while reading.
+        When any of them fails, the mapper preparations not started
+        yet are cancelled and the rest awaited before raising
+        """
+        mappers = [ loop.run_in_executor(None, task) for task in self.mapping.prepare_tasks() ]
+        try:
+            if self.mapping.prepared_before_read:
+                await asyncio.gather(*mappers)
+            await loop.run_in_executor(None, self._read_and_cleanup)
+            await asyncio.gather(*mappers)
+        except BaseException:
+            for mapper in mappers:
+                mapper.cancel()
+            await asyncio.gather(*mappers, return_exceptions=True)
+            raise
+        return
+
+    def _read_and_cleanup(self):
+        """Private method to read and clean up the dump data"""
+        self._read_dump()
+        self._cleanup_data()
+        return
+
+    def _execute_mapping(self):
+        """Executes All Mapping"""
+        try:
+            self.mapping.map(self.reader)
+        except MappingRowsExceededException as e:
+            print("[Error]: Couldn't proceed further due to \n\n{}".format(e.msg()))
+
+        self.reader.validate_mapping()
+        return
+
+    def _get_sales_level_3(self):
+        """Private method to return the correct Sales Level 3"""
+        if self.comm:
+            return 'INDIA_COMM_1'
+        return None
+
+    def _expunge_all_existing_data(self):
+        """Private method to clean up All existing data"""
+        self._warn_user()
+        self._expunge()
+        return
+
+    def _warn_user(self):
+        """Warns the user with the hazardous deletion process"""
+        recs_planned = self.writer.how_many_docs(self.trash_query)
+        print("[Info]: {} row(s) existing! {} row(s) planned for trashing!?!".format(
+            self.writer.recs_before(), recs_planned))
+        return
+
+    def _expunge(self):
+        """Executes the removing of documents from the writable collection"""
+        self.writer.trash_many(self.trash_query)
+        return
+
+
+class CleanBookingDump(CleanDump):
     """Cleans/Validates the ent_dump_from_finance data and 
     creates a new collection 'booking_dump'
     """
@@ -28,19 +125,29 @@ class CleanBookingDump():
     uniquenames_collname = 'master_unique_names'
    
 
-    def __init__(self, history, years, comm, des_tbl, des_db, host=None, port=None):
-        """Initializer of CleanBookingDump
+    def __init__(self, history, years, comm, des_tbl, des_db, host=None, port=None, readers=1, 
+            mapper_cache=None, server_side=False, mapping_engine='merge', pushdown=False, read_opts=None, 
+            write_opts=None, field_config=None):
+        """Initializer of CleanBookingDump; with pushdown, the fields added
+        by the field configuration are read besides the required ones
         """
+        read_opts        = read_opts if read_opts else {}
+        write_opts       = write_opts if write_opts else {}
+        self.readers     = readers if readers else 1
         self.history     = history
         self.years       = years if years else self._get_years(history, '2018')
         self.comm        = comm
         self.sl3         = self._get_sales_level_3()
         self.finmonths   = self._make_fin_months()
-        self.reader      = EntBookingDumpReader(MongoReader(self.edff_collname))
-        self.techmapper  = TechSpec1Reader(MongoReader(self.techmapper_collname))
-        self.segmapper   = SL5ToSegmentsReader(MongoReader(self.segmapper_collname))
-        self.uniquenames = MasterUniqueNamesReader(MongoReader(self.uniquenames_collname))
-        self.writer      = Writer(MongoWriter(des_db, des_tbl, host=host, port=port))
+        self.reader      = EntBookingDumpReader(MongoReader(self.edff_collname, host=host, port=port, **read_opts))
+        self.techmapper  = TechSpec1Reader(MongoReader(self.techmapper_collname, host=host, port=port))
+        self.segmapper   = SL5ToSegmentsReader(MongoReader(self.segmapper_collname, host=host, port=port))
+        self.uniquenames = MasterUniqueNamesReader(MongoReader(self.uniquenames_collname, host=host, port=port))
+        self.writer      = Writer(MongoWriter(des_db, des_tbl, host=host, port=port, **write_opts))
+        self.fields      = self._get_pushdown_fields(field_config) if pushdown else None
+        self.server_side = server_side
+        self.mapping     = engines[mapping_engine](self.techmapper, self.segmapper, self.uniquenames, 
+                cache=mapper_cache)
         self.trash_query = {}
 
     def _get_years(self, history, curr_year):
@@ -54,20 +161,12 @@ class CleanBookingDump():
 
     def execute(self):
         """Public method to execute the whole process"""
-        self._read_dump()
-        self._cleanup_data()
-        self._read_mappers()
+        self._read_all()
         # self._remove_timestamps()
         self._execute_mapping()
         self._write_dump()
         return
 
-    def _write_dump(self):
-        """Writes Cleaned Dump into the new collection"""
-        self._expunge_all_existing_data()
-        self.writer.write(self.reader.df)
-        return
-
     def _remove_timestamps(self):
         """Removes the timestamps from the dataframes"""
         cols_to_be_deleted = 'timestamp'
@@ -86,10 +185,11 @@ class CleanBookingDump():
         map other information
         """
         self.reader.rename_colnames_neatly()
+        if self.server_side:
+            return # Rest of the columns have been derived while reading
         self.reader.upcase_customernames()
         self.reader.upcase_partnernames()
-        self.reader.make_fiscalyearid_column()
-        self.reader.make_fiscalmonthid_column()
+        self.reader.make_fiscal_columns()
         self.reader.make_prodserv_column()
         self.reader.make_cloudflag_column()
         self.reader.make_tiercode_column()
@@ -101,43 +201,23 @@ class CleanBookingDump():
         """Private method to read and store the dump data"""
         print("[Info]: Reading 'ent_dump_from_finance' data")
         qry = { 'sales_level_3': self.sl3 } if self.sl3 else {}
-        loop_params = { 'field': 'fiscal_period_id', 'params': self.finmonths }
-        self.reader.read(qry=qry, loop_params=loop_params)
-        return
-
-    def _read_mappers(self):
-        """Private method to read and store the Mapping data"""
-        print("[Info]: Reading 'tech_spec1' data")
-        self.techmapper.read()
-        print("[Info]: Reading 'sl5_to_segments' data")
-        self.segmapper.read()
-        print("[Info]: Reading 'master_unique_names' data")
-        self.uniquenames.read()
+        loop_params = { 'field': 'fiscal_period_id', 'params': self.finmonths, 'workers': self.readers }
+        stages = self.reader.derivation_stages() if self.server_side else []
+        self.reader.read(qry=qry, loop_params=loop_params, stages=stages + self.mapping.stages(), fields=self.fields)
         return
 
-    def _execute_mapping(self):
-        """Executes All Mapping"""
-        self.techmapper.remove_dedundancy()
-        self.uniquenames.upcase_names()
-        self.uniquenames.upcase_accnames()
-        self.uniquenames.upcase_grpnames()
-        self.uniquenames.remove_dedundancy()
-        self.uniquenames.transform_names_to_customername()
-        try:
-            self.reader.map_technologies(self.techmapper)
-            self.reader.map_segments(self.segmapper)
-            self.reader.map_uniquenames(self.uniquenames)
-        except MappingRowsExceededException as e:
-            print("[Error]: Couldn't proceed further due to \n\n{}".format(e.msg()))
+    def _get_pushdown_fields(self, field_config):
+        """Returns the fields to be read: the required ones and those
+        added by the field configuration, by their names in the dump
+        """
+        source_names = { new_col: col for col, new_col in self.reader.cols_renamable.items() }
+        fields       = list(self.reader.required_fields)
+        for config in PT.parse_field_config(field_config if field_config else []):
+            field = source_names.get(config.field, config.field)
+            if config.switch == 'a' and field not in fields:
+                fields.append(field)
+        return fields
 
-        self.reader.validate_mapping()
-        return
-
-    def _get_sales_level_3(self):
-        """Private method to return the correct Sales Level 3"""
-        if self.comm:
-            return 'INDIA_COMM_1'
-        return None
 
     def _make_fin_months(self):
         """Private method to make financial months using years
@@ -147,26 +227,8 @@ class CleanBookingDump():
             months.append(str(i).zfill(2))
         return [ int(year + month) for year in self.years for month in months]
 
-    def _expunge_all_existing_data(self):
-        """Private method to clean up All existing data"""
-        self._warn_user()
-        self._expunge()
-        return
-
-    def _warn_user(self):
-        """Warns the user with the hazardous deletion process"""
-        recs_planned = self.writer.how_many_docs(self.trash_query)
-        print("[Info]: {} row(s) existing! {} row(s) planned for trashing!?!".format(
-            self.writer.recs_before(), recs_planned))
-        return
-
-    def _expunge(self):
-        """Executes the removing of documents from the writable collection"""
-        self.writer.trash_many(self.trash_query)
-        return
-
 
-class CleanSFDCDump():
+class CleanSFDCDump(CleanDump):
     """Cleans/Validates the 'sfdc_raw_dump' data and 
     creates a new collection 'sfdc_dump'
     """
@@ -177,44 +239,40 @@ class CleanSFDCDump():
     uniquenames_collname = 'master_unique_names'
    
 
-    def __init__(self, comm, des_tbl, des_db, host=None, port=None):
+    def __init__(self, comm, des_tbl, des_db, host=None, port=None, mapper_cache=None, server_side=False, 
+            mapping_engine='merge', read_opts=None, write_opts=None):
         """Initializer of CleanSFDCDump
         """
+        read_opts        = read_opts if read_opts else {}
+        write_opts       = write_opts if write_opts else {}
         self.comm        = comm
         self.sl3         = self._get_sales_level_3()
-        self.reader      = SFDCRawDumpReader(MongoReader(self.raw_collname))
-        self.techmapper  = TechSpec1Reader(MongoReader(self.techmapper_collname))
-        self.segmapper   = SL5ToSegmentsReader(MongoReader(self.segmapper_collname))
-        self.uniquenames = MasterUniqueNamesReader(MongoReader(self.uniquenames_collname))
-        self.writer      = Writer(MongoWriter(des_db, des_tbl, host=host, port=port))
+        self.reader      = SFDCRawDumpReader(MongoReader(self.raw_collname, host=host, port=port, **read_opts))
+        self.techmapper  = TechSpec1Reader(MongoReader(self.techmapper_collname, host=host, port=port))
+        self.segmapper   = SL5ToSegmentsReader(MongoReader(self.segmapper_collname, host=host, port=port))
+        self.uniquenames = MasterUniqueNamesReader(MongoReader(self.uniquenames_collname, host=host, port=port))
+        self.writer      = Writer(MongoWriter(des_db, des_tbl, host=host, port=port, **write_opts))
+        self.server_side = server_side
+        self.mapping     = engines[mapping_engine](self.techmapper, self.segmapper, self.uniquenames, 
+                cache=mapper_cache)
         self.trash_query = {}
 
     def execute(self):
         """Public method to execute the whole process"""
-        self._read_dump()
-        self._cleanup_data()
-        self._read_mappers()
+        self._read_all()
         self._execute_mapping()
         self._write_dump()
         return
 
-    def _write_dump(self):
-        """Writes Cleaned Dump into the new collection"""
-        self._expunge_all_existing_data()
-        self.writer.write(self.reader.df)
-        return
         
     def _cleanup_data(self):
         """Private method to clean up data structure and 
         map other information
         """
+        if self.server_side:
+            return # Columns have been derived while reading
         self.reader.upcase_customernames()
-        self.reader.make_fiscalyearid_column()
-        self.reader.make_fiscalquarter_column()
-        self.reader.make_fiscalquarterid_column()
-        self.reader.make_fiscalmonthid_column()
-        self.reader.make_fiscalweekid_column()
-        self.reader.make_fiscalperiodid_column()
+        self.reader.make_fiscal_columns()
         self.reader.make_prodserv_column()
         self.reader.make_pastdue_column()
         return
@@ -223,60 +281,11 @@ class CleanSFDCDump():
         """Private method to read and store the dump data"""
         print("[Info]: Reading 'sfdc_raw_dump`' data")
         qry = { 'sales_level_3': self.sl3 } if self.sl3 else {}
-        self.reader.read(qry=qry)
+        stages = self.reader.derivation_stages() if self.server_side else []
+        self.reader.read(qry=qry, stages=stages + self.mapping.stages())
         return
 
-    def _read_mappers(self):
-        """Private method to read and store the Mapping data"""
-        print("[Info]: Reading 'tech_spec1' data")
-        self.techmapper.read()
-        print("[Info]: Reading 'sl5_to_segments' data")
-        self.segmapper.read()
-        print("[Info]: Reading 'master_unique_names' data")
-        self.uniquenames.read()
-        return
 
-    def _execute_mapping(self):
-        """Executes All Mapping"""
-        self.techmapper.remove_dedundancy()
-        self.uniquenames.upcase_names()
-        self.uniquenames.upcase_accnames()
-        self.uniquenames.upcase_grpnames()
-        self.uniquenames.remove_dedundancy()
-        self.uniquenames.transform_names_to_customername()
-        try:
-            self.reader.map_technologies(self.techmapper)
-            self.reader.map_segments(self.segmapper)
-            self.reader.map_uniquenames(self.uniquenames)
-        except MappingRowsExceededException as e:
-            print("[Error]: Couldn't proceed further due to \n\n{}".format(e.msg()))
-
-        self.reader.validate_mapping()
-        return
-
-    def _get_sales_level_3(self):
-        """Private method to return the correct Sales Level 3"""
-        if self.comm:
-            return 'INDIA_COMM_1'
-        return None
-
-    def _expunge_all_existing_data(self):
-        """Private method to clean up All existing data"""
-        self._warn_user()
-        self._expunge()
-        return
-
-    def _warn_user(self):
-        """Warns the user with the hazardous deletion process"""
-        recs_planned = self.writer.how_many_docs(self.trash_query)
-        print("[Info]: {} row(s) existing! {} row(s) planned for trashing!?!".format(
-            self.writer.recs_before(), recs_planned))
-        return
-
-    def _expunge(self):
-        """Executes the removing of documents from the writable collection"""
-        self.writer.trash_many(self.trash_query)
-        return
 
 
 
@@ -12,6 +12,7 @@ from raptors.models.writers import Writer, MongoWriter, ExcelWriter
 from raptors.helpers.raptortools import ParsingTool as PT
 from raptors.helpers.raptortools import GeneralTool as GT
 from raptors.helpers.mongoutils import Mongo
+from raptors.helpers.exceptions.controllersexceptions import ConfiguredFieldsMissingException
 from raptors import __version__
 
 __author__ = "Jeyaraj Durairaj"
@@ -26,7 +27,7 @@ class Generate():
     """
 
 
-    def __init__(self, rept_opts, mong_opts, xl_opts):
+    def __init__(self, rept_opts, mong_opts, xl_opts, write_opts=None):
         """Initializer for Generate class"""
         self.name         = rept_opts['name']
         self.owner        = rept_opts['owner']
@@ -35,6 +36,7 @@ class Generate():
         self.field_config = rept_opts['field_config']
         self.mong_opts    = mong_opts
         self.xl_opts      = xl_opts
+        self.write_opts   = write_opts if write_opts else {}
         self.generator    = None
         
     def execute(self):
@@ -51,10 +53,12 @@ class Generate():
         """Sets the type of generator based on 'name'"""
         if self.name.lower() == 'booking':
             self.generator = BookingGenerator(mong_opts=self.mong_opts, owner=self.owner, 
-                    history=self.history, cur_yr=self.cur_year, xl_opts=self.xl_opts, field_config=self.field_config)
+                    history=self.history, cur_yr=self.cur_year, xl_opts=self.xl_opts, field_config=self.field_config,
+                    write_opts=self.write_opts)
         elif self.name.lower() == 'sfdc':
             self.generator = SFDCGenerator(mong_opts=self.mong_opts, owner=self.owner, 
-                    history=self.history, cur_yr=self.cur_year, xl_opts=self.xl_opts, field_config=self.field_config)
+                    history=self.history, cur_yr=self.cur_year, xl_opts=self.xl_opts, field_config=self.field_config,
+                    write_opts=self.write_opts)
         else:
             pass
         return
@@ -65,7 +69,8 @@ class Generator():
     """
 
 
-    def __init__(self, owner='', history='', cur_yr='', xl_opts='', field_config='', mong_opts='', **kwargs):
+    def __init__(self, owner='', history='', cur_yr='', xl_opts='', field_config='', mong_opts='', 
+            write_opts=None, **kwargs):
         """Initializer for Generator class"""
         super().__init__(**kwargs)
         self.owner        = owner.lower()
@@ -77,6 +82,10 @@ class Generator():
         self.dbname       = mong_opts['dbname'] if mong_opts['dbname'] else 'ccsdm'
         self.host         = mong_opts['host'] if mong_opts['host'] else 'localhost'
         self.port         = mong_opts['port'] if mong_opts['port'] else 27017
+        self.readers      = mong_opts.get('readers') if mong_opts.get('readers') else 4
+        self.read_pref    = mong_opts.get('read_preference')
+        self.arrow        = mong_opts.get('arrow', False)
+        self.write_opts   = write_opts if write_opts else {}
         self.months       = self._get_stringified_months()
         self.fin_months   = self._get_fin_months()
         self.qconfig      = {}
@@ -90,7 +99,11 @@ class Generator():
         self.val_fields = set()
 
     def expunge_all_existing_data(self):
-        """Private method to clean up All existing data"""
+        """Private method to clean up All existing data; nothing
+        to clean up when the data is loaded through staging
+        """
+        if self.mong_writer.is_staged():
+            return
         self._warn_user()
         self._expunge()
         return
@@ -107,6 +120,18 @@ class Generator():
         self.mong_writer.trash_many({})
         return
 
+    def _write_collection(self, df):
+        """Writes the data into MongoDB, through a staging
+        collection when staged
+        """
+        if self.mong_writer.is_staged():
+            self.mong_writer.stage()
+            self.mong_writer.write(df)
+            self.mong_writer.promote()
+            return
+        self.mong_writer.write(df)
+        return
+
     def _get_stringified_months(self):
         """Prepares Stringified Months"""
         months = []
@@ -144,9 +169,10 @@ class BookingGenerator(Generator):
         super().__init__(**kwargs)
         self.filename     = os.path.join(self.filepath, PT.timestamped_filename(self.owner + '_' + self.collname, '.xlsx'))
         self.reader       = BookingDumpReader(MongoReader(self.collname, dbname=self.dbname, 
-            host=self.host, port=self.port))
+            host=self.host, port=self.port, read_preference=self.read_pref, arrow=self.arrow), workers=self.readers)
         self.xl_writer    = Writer(ExcelWriter(self.filename, self.sheetname))
-        self.mong_writer  = Writer(MongoWriter(self.dbname, self.summarycollname, host=self.host, port=self.port))
+        self.mong_writer  = Writer(MongoWriter(self.dbname, self.summarycollname, host=self.host, port=self.port, 
+            **self.write_opts))
         self.__all_fields = None
         self.uniq_fields = list(self.uniq_fields.union({ 'sales_agent', 'recurring_offer_flag', 'tier_code', 
             'grp_ver', 'grp_ver2', 'product_classification', 'grp_name', 'deal_id_desc' }))
@@ -155,7 +181,7 @@ class BookingGenerator(Generator):
     def read(self):
         """Public method to read data"""
         print("\nReading Data...")
-        self.reader.read(self.aggpipes)
+        self.reader.read(self.aggpipes, fields=self.all_fields)
         return
 
     def write(self):
@@ -163,7 +189,7 @@ class BookingGenerator(Generator):
         print("Data will be written to {}".format(self.filename))
         self.xl_writer.write(self.reader.df)
         print("Data is now being written to {}.{} collection in MongoDB".format(self.collname, self.summarycollname))
-        self.mong_writer.write(self.reader.df)
+        self._write_collection(self.reader.df)
         return
 
     @property
@@ -190,6 +216,7 @@ class BookingGenerator(Generator):
     def set_field_config(self):
         """Validates and sets teh configuration for field addition/removal"""
         configs = PT.parse_field_config(self.field_config)
+        self._check_added_fields([ config.field for config in configs if config.switch == 'a' ])
         for config in configs:
             if config.switch == 'a':
                 self.uniq_fields.append(config.field)
@@ -205,6 +232,16 @@ class BookingGenerator(Generator):
         self.__all_fields.extend(self.val_fields)
         return
 
+    def _check_added_fields(self, fields):
+        """Raises if fields added by the configuration are missing in
+        the dump, as when it was made by reading only the required fields
+        """
+        existing = self.reader.reader.field_names()
+        missing  = [ field for field in fields if field not in existing ]
+        if existing and missing:
+            raise ConfiguredFieldsMissingException(missing, self.collname)
+        return
+
 
 class SFDCGenerator(Generator):
 
@@ -216,9 +253,10 @@ class SFDCGenerator(Generator):
         super().__init__(**kwargs)
         self.filename     = os.path.join(self.filepath, PT.timestamped_filename(self.owner + '_' + self.collname, '.xlsx'))
         self.reader       = SFDCDumpReader(MongoReader(self.collname, dbname=self.dbname, 
-            host=self.host, port=self.port))
+            host=self.host, port=self.port, read_preference=self.read_pref, arrow=self.arrow))
         self.xl_writer    = Writer(ExcelWriter(self.filename, self.sheetname))
-        self.mong_writer  = Writer(MongoWriter(self.dbname, self.cleaned_collname, host=self.host, port=self.port))
+        self.mong_writer  = Writer(MongoWriter(self.dbname, self.cleaned_collname, host=self.host, port=self.port, 
+            **self.write_opts))
         self.sl3          = 'INDIA_COMM_1'
 
     def read(self):
@@ -243,7 +281,7 @@ class SFDCGenerator(Generator):
         print("Data will be written to {}".format(self.filename))
         self.xl_writer.write(self.reader.df)
         print("Data will be written to {}.{} collection".format(self.dbname, self.cleaned_collname))
-        self.mong_writer.write(self.reader.df)
+        self._write_collection(self.reader.df)
         return
 
 
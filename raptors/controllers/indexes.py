@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import division, print_function, absolute_import
+
+import sys
+import os
+from pymongo.errors import OperationFailure
+from raptors.models.writers import Writer, MongoWriter
+from raptors.models.indexspecs import IndexRegistry
+
+from raptors import __version__
+
+__author__ = "Jeyaraj Durairaj"
+__copyright__ = "Jeyaraj Durairaj"
+__license__ = "none"
+
+
+class Indexes():
+    """Creates the indexes declared for the collections and
+    reports the existing ones which are unused or redundant
+    """
+
+
+    def __init__(self, collections=None, dbname=None, host=None, port=None, create=True):
+        """Initializer of Indexes class"""
+        self.collections = collections if collections else IndexRegistry.collections()
+        self.dbname      = dbname if dbname else 'ccsdm'
+        self.host        = host
+        self.port        = port
+        self.create      = create
+
+    def execute(self):
+        """Public method to execute the whole process"""
+        for collname in self.collections:
+            print("\n[Info]: Indexes of '{}.{}'".format(self.dbname, collname))
+            writer = Writer(MongoWriter(self.dbname, collname, host=self.host, port=self.port))
+            if self.create:
+                self._create_missing(writer, collname)
+            self._report_unused(writer)
+            self._report_redundant(writer)
+        return
+
+    def _create_missing(self, writer, collname):
+        """Creates the declared indexes missing in the collection"""
+        created = writer.ensure_indexes(IndexRegistry.get(collname))
+        for name in created:
+            print("[Info]: Index '{}' is being built in the background".format(name))
+        if not created:
+            print("[Info]: All declared indexes exist")
+        return
+
+    def _report_unused(self, writer):
+        """Reports the indexes which have not served any operation"""
+        try:
+            usage = writer.index_usage()
+        except OperationFailure as e:
+            print("[Warning]: Index usage is not available due to \n\n{}".format(e))
+            return
+        for name, ops in sorted(usage.items()):
+            if name != '_id_' and ops == 0:
+                print("[Warning]: Index '{}' has not been used since the server started".format(name))
+        return
+
+    def _report_redundant(self, writer):
+        """Reports the indexes covered by another one"""
+        for name, covering in self.find_redundant(writer.index_keys()):
+            print("[Warning]: Index '{}' is redundant, it is a prefix of '{}'".format(name, covering))
+        return
+
+    @staticmethod
+    def find_redundant(index_keys):
+        """Returns (name, covering name) pairs of the indexes whose keys
+        are a prefix of the keys of another index
+        """
+        redundant = []
+        for name, keys in sorted(index_keys.items()):
+            if name == '_id_':
+                continue
+            for other, other_keys in sorted(index_keys.items()):
+                if other != name and len(other_keys) > len(keys) and other_keys[:len(keys)] == keys:
+                    redundant.append((name, other))
+                    break
+        return redundant
@@ -4,11 +4,17 @@ from __future__ import division, print_function, absolute_import
 
 import sys
 import os
+import glob
+import time
 from datetime import datetime
-from raptors.models.readers import Reader, ExcelReader, MongoReader
+import pandas as pd
+from raptors.models.readers import Reader, ExcelReader, CSVReader, ParquetReader, MultiSourceReader, MongoReader
 from raptors.models.writers import Writer, MongoWriter
+from raptors.models.schemas import SchemaRegistry
 from raptors.helpers.mongoutils import Mongo
 from raptors.helpers.exceptions.modelsexceptions import CollectionDoesNotExistException
+from raptors.helpers.exceptions.modelsexceptions import FileDoesNotExistException
+from raptors.helpers.exceptions.controllersexceptions import SyncOptionsConflictException
 from raptors import __version__
 
 __author__ = "Jeyaraj Durairaj"
@@ -22,29 +28,114 @@ class Sync():
     """
     
 
-    def __init__(self, org_db, org_tbl, des_db, des_tbl, 
-            host=None, port=None, streaming=False, sensitive_colls=[]):
-        """Initializer for Sync class"""
-        self.reader          = Reader(ExcelReader(org_db, org_tbl))
-        self.writer          = Writer(MongoWriter(des_db, des_tbl, host=host, port=port))
+    fingerprint_col     = 'row_hash'
+    readable_extensions = [ '.xlsx', '.xlsm', '.xls', '.csv', '.parquet' ]
+    excel_extensions    = [ '.xlsx', '.xlsm', '.xls' ]
+    
+
+    def __init__(self, org_db, org_tbl, des_db, des_tbl, host=None, port=None, streaming=False, 
+            chunksize=50000, incremental=False, cache=None, readers=None, sensitive_colls=[], write_opts=None):
+        """Initializer for Sync class; 'org_db' and 'org_tbl' may also
+        be lists of files and sheets to be ingested together
+        """
+        if incremental and streaming:
+            raise SyncOptionsConflictException("Incremental mode reads the whole file, it can not be streamed")
+        write_opts           = write_opts if write_opts else {}
+        self.writer          = Writer(MongoWriter(des_db, des_tbl, host=host, port=port, **write_opts))
         self.streaming       = streaming
+        self.incremental     = incremental
         self.sensitive_colls = sensitive_colls if sensitive_colls else [ 'ent_dump_from_finance', 'ent_dump_from_finance_old' ]
         self.is_sensitive    = des_tbl in self.sensitive_colls
         self.is_sfdc         = des_tbl == 'sfdc_raw_dump'
         self.clean_cols      = []
         try:
             if self.is_sensitive:
-                self.clean_cols  = Reader(MongoReader('booking_dump_cols')).read_dict()
+                self.clean_cols  = Reader(MongoReader('booking_dump_cols', host=host, port=port)).read_dict()
             if self.is_sfdc:
-                self.clean_cols  = Reader(MongoReader('sfdc_dump_cols')).read_dict()
+                self.clean_cols  = Reader(MongoReader('sfdc_dump_cols', host=host, port=port)).read_dict()
         except CollectionDoesNotExistException as e:
             print("[Error]: Couldn't proceed further due to \n\n{}".format(e.msg()))
+        self.schema          = self._get_schema(des_tbl)
+        self.reader          = Reader(self._make_reader(org_db, org_tbl, chunksize, cache, readers))
         self.trash_query     = {}
+        self.expunged_weeks  = set()
+        self.stamp           = datetime.fromtimestamp(time.time(), None)
+
+    @classmethod
+    def expand_sources(cls, path):
+        """Expands a directory or a glob pattern into the list of
+        readable files it contains; raises if there is none
+        """
+        path = os.path.expanduser(path)
+        if os.path.isdir(path):
+            paths = [ os.path.join(path, name) for name in os.listdir(path) ]
+        elif glob.has_magic(path):
+            paths = glob.glob(path)
+        else:
+            return [ path ]
+        paths = sorted(p for p in paths if os.path.splitext(p)[1].lower() in cls.readable_extensions)
+        if not paths:
+            raise FileDoesNotExistException(path)
+        return paths
+
+    def _make_reader(self, org_db, org_tbl, chunksize, cache, readers):
+        """Makes one source reader or, for several files/sheets, 
+        a reader parsing all of them in parallel
+        """
+        filepaths  = org_db if isinstance(org_db, (list, tuple)) else [ org_db ]
+        sheetnames = org_tbl if isinstance(org_tbl, (list, tuple)) and org_tbl else [ org_tbl ]
+        sheetnames = [ sheetname if sheetname else None for sheetname in sheetnames ]
+        sources    = []
+        for filepath in filepaths:
+            is_excel = os.path.splitext(filepath)[1].lower() in self.excel_extensions
+            for sheetname in (sheetnames if is_excel else [ None ]):
+                sources.append(self._make_source_reader(filepath, sheetname, chunksize, cache))
+        if len(sources) == 1:
+            return sources[0]
+        return MultiSourceReader(sources, workers=readers)
+
+    def _make_source_reader(self, filepath, sheetname, chunksize, cache):
+        """Picks the reader of the source file by its extension"""
+        extn     = os.path.splitext(filepath)[1].lower()
+        dropcols = self._get_dropcols()
+        if extn == '.csv':
+            return CSVReader(filepath, chunksize=chunksize, dtypes=self._get_csv_dtypes(filepath), dropcols=dropcols, 
+                    schema=self.schema)
+        elif extn == '.parquet':
+            return ParquetReader(filepath, chunksize=chunksize, dropcols=dropcols, schema=self.schema)
+        return ExcelReader(filepath, sheetname, chunksize=chunksize, cache=cache, dropcols=dropcols, schema=self.schema)
+
+    def _get_schema(self, des_tbl):
+        """Returns the registered schema of the collection, resolved
+        against the source column names renamed by the clean columns
+        """
+        schema = SchemaRegistry.get(des_tbl)
+        if schema is not None and isinstance(self.clean_cols, dict):
+            schema = schema.resolve(self.clean_cols)
+        return schema
+
+    def _get_csv_dtypes(self, filepath):
+        """Returns the dtypes the schema declares for the columns of the
+        CSV file, so that they are not inferred chunk by chunk
+        """
+        if self.schema is None or not os.path.isfile(filepath):
+            return None
+        return self.schema.csv_dtypes(CSVReader.read_header(filepath))
+
+    def _get_dropcols(self):
+        """Derives the columns never kept from the clean columns
+        configuration, so that they are not even parsed
+        """
+        if not isinstance(self.clean_cols, dict):
+            return []
+        return [ col for col, new_col in self.clean_cols.items() if new_col == 'not_to_be_mapped' ]
 
     def execute(self):
         """Public method that executes the Syncing the data to MongoDB"""
         self._validate()
-        if self.streaming:
+        if self.incremental:
+            self._sync_by_incremental()
+        elif self.streaming:
             self._sync_by_streaming()
         else:
             self._sync_by_bulk()
@@ -62,7 +153,15 @@ class Sync():
         """Synchronizes the template data into MongoDB by
         writing as the reading goes on
         """
-        pass
+        print("[Info]: Streaming data...")
+        if not self.is_sensitive:
+            self._expunge_all_existing_data()
+        for chunk in self.reader.read_chunks():
+            self._cleanup()
+            if self.is_sensitive:
+                self._expunge_existing_data()
+            self.writer.write(self.reader.df)
+        return
 
     def _sync_by_bulk(self):
         """Synchronizes the template data in the order of 
@@ -77,19 +176,61 @@ class Sync():
         self.writer.write(self.reader.df)
         return
 
+    def _sync_by_incremental(self):
+        """Synchronizes the template data into MongoDB by writing
+        only the rows whose fingerprints are not stored yet and
+        removing the stored ones no longer present in the file
+        """
+        self._read_and_cleanup()
+        typed = self.schema.declared(self.reader.df.columns) if self.schema is not None else []
+        self.reader.add_fingerprint(self.fingerprint_col, typed=typed)
+        if self.is_sensitive:
+            field            = 'fiscal_week_id'
+            self.trash_query = Mongo.make_OR(self.reader.get_uniques(field), field)
+        stored = self.writer.fingerprints(self.trash_query, self.fingerprint_col)
+        to_insert, to_trash = self._diff_fingerprints(self.reader.df[self.fingerprint_col], 
+                stored[self.fingerprint_col])
+        ids = stored.loc[to_trash, '_id'].tolist()
+        print("[Info]: {} row(s) to be added, {} row(s) to be removed, {} row(s) unchanged".format(
+            int(to_insert.sum()), len(ids), int((~to_insert).sum())))
+        if ids:
+            self.writer.trash_ids(ids)
+        if to_insert.any():
+            self.writer.write(self.reader.df.loc[to_insert.values, :])
+        return
+
+    @staticmethod
+    def _diff_fingerprints(new, stored):
+        """Pairs every fingerprint with its occurrence number so that
+        duplicate rows are matched one to one and returns the masks of
+        new rows to insert and stored documents to remove
+        """
+        new_keys    = pd.MultiIndex.from_arrays([ new.values, new.groupby(new).cumcount().values ])
+        stored      = stored.fillna(0).astype('int64')
+        stored_keys = pd.MultiIndex.from_arrays([ stored.values, stored.groupby(stored).cumcount().values ])
+        to_insert   = pd.Series(~new_keys.isin(stored_keys), index=new.index)
+        to_trash    = pd.Series(~stored_keys.isin(new_keys), index=stored.index)
+        return to_insert, to_trash
+
     def _read_and_cleanup(self):
         """Private method to read the data and clean up"""
         print("[Info]: Reading data...")
         self.reader.read() # Reads and stores the dataframe
+        self._cleanup()
+        return
+
+    def _cleanup(self):
+        """Private method to clean up the dataframe currently held by the reader"""
         print("[Info]: Cleaning data...")
         self.reader.downcase_colnames() # Calling DataFrameHelper function through Reader class
-        self.reader.fill_notapplicables() # By default, fill value is zero
+        fills = self.schema.fills_for(self.reader.df.columns) if self.schema is not None else None
+        self.reader.fill_notapplicables(fills=fills) # By default, fill value is zero
         if self.is_sensitive or self.is_sfdc:
             self.reader.rename_columns(self.clean_cols)
-            if self.is_sensitive:
+            if self.is_sensitive and 'not_to_be_mapped' in self.reader.df.columns:
                 self.reader.delete_columns('not_to_be_mapped')
         if self.is_sensitive or self.is_sfdc:
-            self.reader.add_timestamp() # Adding timestamp to all dataframe
+            self.reader.add_timestamp(self.stamp) # Adding timestamp to all dataframe
         return
 
     def _expunge_all_existing_data(self):
@@ -99,9 +240,14 @@ class Sync():
         return
 
     def _expunge_existing_data(self):
-        """Private method to clean up the existing data"""
+        """Private method to clean up the existing data of the weeks
+        not expunged yet
+        """
         field            = 'fiscal_week_id'
-        weeks            = self.reader.get_uniques(field)
+        weeks            = [ week for week in self.reader.get_uniques(field) if week not in self.expunged_weeks ]
+        if not weeks:
+            return
+        self.expunged_weeks.update(weeks)
         self.trash_query = Mongo.make_OR(weeks, field)
         self._warn_user()
         self._expunge()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import division, print_function, absolute_import
+
+import sys
+import os
+import hashlib
+import time
+import pandas as pd
+
+from raptors import __version__
+
+__author__ = "Jeyaraj Durairaj"
+__copyright__ = "Jeyaraj Durairaj"
+__license__ = "none"
+
+
+class FrameCache():
+    """On-disk columnar cache of Pandas dataframes with
+    size based eviction of the least recently used entries
+    """
+
+    formats   = [ ('.parquet', pd.read_parquet), ('.pkl', pd.read_pickle) ]
+    stale_tmp = 3600 # seconds after which a temporary file is left over from a failed store
+
+
+    def __init__(self, cachedir, max_bytes=2*1024**3):
+        """Initializer for FrameCache class"""
+        self.cachedir  = os.path.expanduser(cachedir)
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def make_key(*parts):
+        """Makes a cache key out of the given parts"""
+        return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+    def load(self, key):
+        """Returns the cached dataframe of the key or None when missing,
+        also when another process evicts the entry while it is loaded
+        """
+        for extn, loader in self.formats:
+            path = self._path(key, extn)
+            try:
+                os.utime(path) # Marks the entry as recently used
+                return loader(path)
+            except FileNotFoundError:
+                continue
+        return None
+
+    def store(self, key, df):
+        """Stores the dataframe as Parquet, falling back to pickle
+        when the frame holds columns Parquet can not represent
+        """
+        os.makedirs(self.cachedir, exist_ok=True)
+        try:
+            self._write(key, '.parquet', lambda tmp: df.to_parquet(tmp, index=False))
+        except (ImportError, ValueError, TypeError, NotImplementedError):
+            self._write(key, '.pkl', lambda tmp: df.reset_index(drop=True).to_pickle(tmp))
+        self._evict()
+        return
+
+    def _write(self, key, extn, write):
+        """Writes the entry through a temporary file swapped in place,
+        removing the temporary file when the write fails
+        """
+        path = self._path(key, extn)
+        tmp  = path + '.tmp'
+        try:
+            write(tmp)
+            os.replace(tmp, path)
+        except BaseException:
+            self._remove(tmp)
+            raise
+        return
+
+    def _remove(self, path):
+        """Removes the file, if another process has not already"""
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        return
+
+    def _path(self, key, extn):
+        """Returns the file path of the cache entry"""
+        return os.path.join(self.cachedir, key + extn)
+
+    def _evict(self):
+        """Removes the temporary files left over and the least recently
+        used entries until the cache fits into its size limit; files
+        may be removed concurrently by other processes meanwhile
+        """
+        entries = []
+        for name in os.listdir(self.cachedir):
+            path = os.path.join(self.cachedir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            if not os.path.isfile(path):
+                continue
+            if name.endswith('.tmp'):
+                if time.time() - stat.st_mtime > self.stale_tmp:
+                    self._remove(path)
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        tot_bytes = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if tot_bytes <= self.max_bytes:
+                break
+            self._remove(path)
+            tot_bytes -= size
+        return
@@ -43,4 +43,37 @@ class BothCommAndAllSL3TrueError(Exception):
         """Special Error message
         """
         return err
-        
+
+
+class SyncOptionsConflictException(Exception):
+    """Options of the sync which can not be used together
+    """
+    
+
+    def __init__(self, err):
+        """Initializer for SyncOptionsConflictException class"""
+        super().__init__("Options of the sync conflict")
+        self.err = err
+
+    def msg(self):
+        """Special Error message
+        """
+        return self.err
+
+
+class ConfiguredFieldsMissingException(Exception):
+    """Fields of the field configuration missing in the collection
+    """
+    
+
+    def __init__(self, fields, coll):
+        """Initializer for ConfiguredFieldsMissingException class"""
+        super().__init__("Configured fields do not exist in the collection")
+        self.fields = fields
+        self.coll   = coll
+
+    def msg(self):
+        """Special Error message
+        """
+        return "{} not found in '{}'; a dump made with --pushdown keeps them only if given by --field-config".format(
+            self.fields, self.coll)
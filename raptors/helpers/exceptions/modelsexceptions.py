@@ -28,6 +28,21 @@ class ExcelFileDoesNotExistException(Exception):
         return "{} is not a file or does not exist!!!".format(self.path)
         
 
+class FileDoesNotExistException(Exception):
+    """Source file existence Error
+    """
+
+
+    def __init__(self, path):
+        """Initializer for FileDoesNotExistException class"""
+        super().__init__("Either the file does not exist or the path is not a file")
+        self.path = path
+
+    def msg(self):
+        """Special Error Message"""
+        return "{} is not a file or does not exist!!!".format(self.path)
+        
+
 class ExcelSheetDoesNotExistException(Exception):
     """Excel Sheet existence Error
     """
@@ -72,24 +87,34 @@ class MappingRowsExceededException(Exception):
     def msg(self):
         """Special Error Message"""
         return "Expected {} row(s), but found {} row(s)".format(self.rows_bef, self.rows_aft)
-        
-        
-
-
-
-
-
-
-
-
-
 
 
+class WriteVerificationFailedException(Exception):
+    """Number of documents after writing does not match the expected
+    """
 
 
+    def __init__(self, expected, found):
+        """Initializer for WriteVerificationFailedException class"""
+        super().__init__("Documents after writing do not match the expected count")
+        self.expected = expected
+        self.found    = found
 
+    def msg(self):
+        """Special Error Message"""
+        return "Expected {} document(s), but found {} document(s)".format(self.expected, self.found)
 
 
+class PartitionWriteFailedException(Exception):
+    """Partitions of a parallel write failed
+    """
 
 
+    def __init__(self, parts):
+        """Initializer for PartitionWriteFailedException class"""
+        super().__init__("Partitions of the parallel write failed")
+        self.parts = parts
 
+    def msg(self):
+        """Special Error Message"""
+        return "{} partition(s) failed to be written: {}".format(len(self.parts), self.parts)
@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import division, print_function, absolute_import
+
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+from raptors import __version__
+
+__author__ = "Jeyaraj Durairaj"
+__copyright__ = "Jeyaraj Durairaj"
+__license__ = "none"
+
+
+class FiscalCalendar():
+    """Fiscal calendar dimension of a dataframe: the table of its distinct
+    fiscal keys, from which every fiscal id is derived once per key and
+    broadcast to the rows by integer indexing
+    """
+
+
+    def __init__(self, keys):
+        """Initializer for FiscalCalendar class"""
+        self.keys = list(keys)
+
+    def fill(self, df, derivations, dtypes=None):
+        """Fills the derived columns of the dataframe in place; derivations
+        map the new column names to functions of a key tuple
+        """
+        dtypes       = dtypes if dtypes else {}
+        codes, table = self.dimension(df)
+        keys         = list(table.itertuples(index=False))
+        for colname, derive in derivations.items():
+            values      = np.array([ derive(key) for key in keys ], dtype=dtypes.get(colname, object))
+            df[colname] = values.take(codes)
+        return df
+
+    def dimension(self, df):
+        """Returns the code of every row into the table of the distinct
+        keys in order of appearance, and the table itself
+        """
+        codes = np.zeros(df.shape[0], dtype='int64')
+        for key in self.keys:
+            key_codes, uniques = pd.factorize(df[key])
+            codes = codes * (len(uniques) + 1) + (key_codes + 1) # Missing keys get code -1
+        codes, _ = pd.factorize(codes)
+        _, first = np.unique(codes, return_index=True)
+        return codes, df[self.keys].iloc[first].reset_index(drop=True)
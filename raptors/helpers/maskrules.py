@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import division, print_function, absolute_import
+
+import sys
+import os
+import numpy as np
+import pandas as pd
+from raptors.helpers.mongoutils import Mongo
+
+from raptors import __version__
+
+__author__ = "Jeyaraj Durairaj"
+__copyright__ = "Jeyaraj Durairaj"
+__license__ = "none"
+
+
+class MaskRules():
+    """Ordered (predicate, value) rules deriving a column: the first
+    predicate holding gives the value, the default otherwise; with
+    keep=True the default is the column's current value. Predicates
+    are made by the static methods and evaluated once each, in Pandas
+    by a vectorized select and in MongoDB by a $switch expression
+    """
+
+
+    def __init__(self, rules, default=np.nan, keep=False):
+        """Initializer for MaskRules class"""
+        self.rules   = list(rules)
+        self.default = default
+        self.keep    = keep
+
+    @staticmethod
+    def startswith(field, *prefixes):
+        """Makes predicate checking whether the field starts with any of the prefixes"""
+        return ('startswith', field, prefixes)
+
+    @staticmethod
+    def equals(field, value):
+        """Makes predicate checking whether the field equals the value"""
+        return ('equals', field, value)
+
+    @staticmethod
+    def isin(field, *values):
+        """Makes predicate checking whether the field is any of the values"""
+        return ('isin', field, values)
+
+    @staticmethod
+    def less(field, value):
+        """Makes predicate checking whether the field is a number less than the value"""
+        return ('less', field, value)
+
+    @staticmethod
+    def greater_equal(field, value):
+        """Makes predicate checking whether the field is a number greater than or equal to the value"""
+        return ('greater_equal', field, value)
+
+    def derive(self, df, colname):
+        """Returns the values of the column derived from the dataframe"""
+        masks = {}
+        for predicate, _ in self.rules:
+            if predicate not in masks:
+                masks[predicate] = self._evaluate(df, predicate)
+        if self.keep and colname in df.columns:
+            default = df[colname].to_numpy(dtype=object)
+        else:
+            default = np.asarray(self.default, dtype=object)
+        return np.select(
+            [ masks[predicate] for predicate, _ in self.rules ],
+            [ np.asarray(value, dtype=object) for _, value in self.rules ],
+            default=default,
+        )
+
+    def switch(self, colname):
+        """Returns the $switch expression deriving the column in MongoDB"""
+        default = '$' + colname if self.keep else (None if pd.isnull(self.default) else self.default)
+        return Mongo.make_switch([ (self._expression(predicate), value) for predicate, value in self.rules ], default)
+
+    def _evaluate(self, df, predicate):
+        """Evaluates the predicate into a boolean array, false where missing"""
+        op, field, arg = predicate
+        values = df[field]
+        if op == 'startswith':
+            mask = np.zeros(len(values), dtype=bool)
+            for prefix in arg:
+                mask |= values.str.startswith(prefix, na=False).to_numpy(dtype=bool)
+            return mask
+        if op == 'equals':
+            return (values == arg).to_numpy(dtype=bool)
+        if op == 'isin':
+            return values.isin(arg).to_numpy(dtype=bool)
+        if op == 'less':
+            return (values < arg).to_numpy(dtype=bool)
+        if op == 'greater_equal':
+            return (values >= arg).to_numpy(dtype=bool)
+        raise ValueError("Unknown predicate '{}'".format(op))
+
+    def _expression(self, predicate):
+        """Makes the MongoDB expression of the predicate"""
+        op, field, arg = predicate
+        if op == 'startswith':
+            return Mongo.make_startswith(field, *arg)
+        if op == 'equals':
+            return { '$eq': [ '$' + field, arg ] }
+        if op == 'isin':
+            return { '$in': [ '$' + field, list(arg) ] }
+        if op == 'less':
+            return { '$and': [ Mongo.make_isnumber(field), { '$lt': [ '$' + field, arg ] } ] }
+        if op == 'greater_equal':
+            return { '$and': [ Mongo.make_isnumber(field), { '$gte': [ '$' + field, arg ] } ] }
+        raise ValueError("Unknown predicate '{}'".format(op))
+
@@ -4,6 +4,8 @@ from __future__ import division, print_function, absolute_import
 
 import sys
 import os
+import threading
+from pymongo import MongoClient, ReadPreference
 
 from raptors import __version__
 
@@ -52,6 +54,64 @@ class Mongo():
         val_grp  = Mongo._make_val_fields_project(val_fields)
         return { **obj, **uniq_grp, **val_grp }
     
+    @staticmethod
+    def make_string(field):
+        """Makes expression of the field as string, empty if null"""
+        return { '$ifNull': [ { '$toString': '$' + field }, '' ] }
+
+    @staticmethod
+    def make_head(field, length):
+        """Makes expression of the first characters of the field"""
+        return { '$substrCP': [ Mongo.make_string(field), 0, length ] }
+
+    @staticmethod
+    def make_tail(field, length):
+        """Makes expression of the last characters of the field"""
+        return { '$let': {
+            'vars': { 'str': Mongo.make_string(field) },
+            'in'  : { '$substrCP': [ '$$str', { '$max': [ 0, { '$subtract': [ { '$strLenCP': '$$str' }, length ] } ] }, length ] },
+        } }
+
+    @staticmethod
+    def make_zfill(field, width):
+        """Makes expression of the field padded with zeros on the left"""
+        return { '$let': {
+            'vars': { 'str': Mongo.make_string(field) },
+            'in'  : { '$cond': [
+                { '$lt': [ { '$strLenCP': '$$str' }, width ] },
+                { '$concat': [ { '$substrCP': [ '0' * width, 0, { '$subtract': [ width, { '$strLenCP': '$$str' } ] } ] }, '$$str' ] },
+                '$$str',
+            ] },
+        } }
+
+    @staticmethod
+    def make_upcase(field):
+        """Makes expression of the field in upper case, leaving non strings as they are"""
+        return { '$cond': [ { '$eq': [ { '$type': '$' + field }, 'string' ] }, { '$toUpper': '$' + field }, '$' + field ] }
+
+    @staticmethod
+    def make_startswith(field, *prefixes):
+        """Makes expression checking whether the field starts with any of the prefixes"""
+        return { '$or': [ { '$eq': [ Mongo.make_head(field, len(prefix)), prefix ] } for prefix in prefixes ] }
+
+    @staticmethod
+    def make_isnumber(field):
+        """Makes expression checking whether the field is a number"""
+        return { '$in': [ { '$type': '$' + field }, [ 'double', 'int', 'long', 'decimal' ] ] }
+
+    @staticmethod
+    def make_switch(branches, default=None):
+        """Makes $switch expression from the (case, value) pairs"""
+        return { '$switch': { 
+            'branches': [ { 'case': case, 'then': then } for case, then in branches ], 
+            'default' : default,
+        } }
+
+    @staticmethod
+    def make_map(field, mapper, default=None):
+        """Makes $switch expression mapping the values of the field"""
+        return Mongo.make_switch([ ({ '$eq': [ '$' + field, key ] }, val) for key, val in mapper.items() ], default)
+
     @classmethod
     def _make_uniq_fields_group(cls, fields):
         """Makes group object from unique fields"""
@@ -83,19 +143,53 @@ class Mongo():
         for field in fields:
             obj[field] = '$' + field
         return obj
-       
-
-
-
-
-
-
-
 
 
+class MongoClients():
+    """Process-wide registry of MongoClients keyed by host and port,
+    so that all the readers and writers share one connection pool
+    """
 
+    options     = { 'maxPoolSize': 100 }
+    clients     = {}
+    pid         = None
+    lock        = threading.Lock()
+    preferences = {
+        'primary'            : ReadPreference.PRIMARY,
+        'primaryPreferred'   : ReadPreference.PRIMARY_PREFERRED,
+        'secondary'          : ReadPreference.SECONDARY,
+        'secondaryPreferred' : ReadPreference.SECONDARY_PREFERRED,
+        'nearest'            : ReadPreference.NEAREST,
+    }
 
 
+    @classmethod
+    def configure(cls, **options):
+        """Sets the options of the clients created from now on,
+        e.g. maxPoolSize, compressors and timeouts; None values are ignored
+        """
+        with cls.lock:
+            cls.options = { **cls.options, **{ key: val for key, val in options.items() if val is not None } }
+            cls.clients = {}
+        return
 
+    @classmethod
+    def get(cls, host=None, port=None):
+        """Returns the shared client of the host and port"""
+        host = host if host else 'localhost'
+        port = int(port) if port else 27017
+        with cls.lock:
+            if cls.pid != os.getpid(): # Clients must not be shared across forked processes
+                cls.clients = {}
+                cls.pid     = os.getpid()
+            if (host, port) not in cls.clients:
+                cls.clients[(host, port)] = MongoClient(host, port, **cls.options)
+            return cls.clients[(host, port)]
 
+    @classmethod
+    def read_preference(cls, name):
+        """Returns the read preference by its MongoDB mode name"""
+        if name is None:
+            return None
+        return cls.preferences[name]
 
@@ -42,24 +42,76 @@ class DataFrameHelper():
             return x
         return x.lower()
 
-    def add_timestamp(self):
+    def add_timestamp(self, stamp=None):
         """Adding Timestamp into the dataframe"""
-        self.df.loc[:, 'timestamp'] = datetime.datetime.fromtimestamp(time.time(), None)
+        if stamp is None:
+            stamp = datetime.datetime.fromtimestamp(time.time(), None)
+        self.df.loc[:, 'timestamp'] = stamp
         return
 
+    def add_fingerprint(self, colname='row_hash', exclude=('timestamp',), typed=()):
+        """Adds a stable content hash of every row, computed over all the
+        columns in sorted order but the excluded ones; the columns not
+        typed by a schema are hashed as text, so that the hash does not
+        depend on the dtypes they have been inferred with
+        """
+        cols   = sorted(col for col in self.df.columns if col not in exclude and col != colname)
+        frame  = pd.DataFrame({ col: self.df[col] if col in typed else self._fingerprintable(self.df[col]) 
+            for col in cols }, index=self.df.index)
+        hashes = pd.util.hash_pandas_object(frame, index=False)
+        self.df.loc[:, colname] = hashes.values.view('int64')
+        return
+
+    @staticmethod
+    def _fingerprintable(series):
+        """Returns the values of the series as text, the integral floats
+        as integers, as a column holds floats once it has a blank
+        """
+        text = series.astype(str)
+        if pd.api.types.is_float_dtype(series):
+            integral       = (series % 1 == 0).to_numpy()
+            text[integral] = series[integral].astype('int64').astype(str)
+        return text
+
     def rename_columns(self, cols_mapper):
         """Public method to rename the column names"""
         self.df.rename(columns=cols_mapper, inplace=True)
         return
 
     def make_new_column(self, mapper, colname, new_colname=None):
-        """Makes a new column based on the mapper provided"""
+        """Makes a new column based on the mapper provided; function
+        mappers are applied once per unique value of the column
+        """
+        if callable(mapper):
+            values = self.map_uniques(self.df.loc[:, colname], mapper)
+        else:
+            values = self.df.loc[:, colname].map(mapper)
         if new_colname is None:
-            self.df.loc[:, colname] = self.df.loc[:, colname].map(mapper)
+            self.df.loc[:, colname] = values
         else:
-            self.df.loc[:, new_colname] = self.df.loc[:, colname].map(mapper)
+            self.df.loc[:, new_colname] = values
         return
 
+    @staticmethod
+    def map_uniques(series, mapper):
+        """Maps the series by a pure function of the value, calling it
+        once per unique value and taking the results back by the codes;
+        missing values are mapped as they are, row by row. Values of mixed
+        types are told apart by their types too, as 1, 1.0 and True are equal
+        """
+        if series.dtype == object and pd.api.types.infer_dtype(series, skipna=True).startswith('mixed'):
+            codes, keys = pd.factorize(pd.Series([ (type(value), value) for value in series ], dtype=object))
+            uniques     = pd.Series([ value for _, value in keys ], dtype=object)
+        else:
+            codes, uniques = pd.factorize(series)
+        values  = pd.Series(pd.Series(uniques).map(mapper).array.take(codes, allow_fill=True), index=series.index)
+        missing = codes < 0
+        if missing.any():
+            values          = values.astype(object)
+            values[missing] = series[missing].map(mapper).values
+            values          = values.infer_objects()
+        return values
+
     def make_column_by_configuration(self, configs, new_colname, final_type=None):
         """Makes a new column based on the mapper provided"""
         self.df.loc[:, new_colname] = ''
@@ -119,8 +171,12 @@ class DataFrameHelper():
         self.df.rename(columns=str.lower, inplace=True)
         return
 
-    def fill_notapplicables(self, val=0):
-        """Public method to fill the not applicables with suitable value"""
+    def fill_notapplicables(self, val=0, fills=None):
+        """Public method to fill the not applicables with the per-column
+        fill values given, and the suitable value everywhere else
+        """
+        if fills:
+            self.df.fillna(value=fills, inplace=True)
         self.df.fillna(value=val, inplace=True)
         return
 
@@ -133,6 +189,11 @@ class DataFrameHelper():
         for filler, mask in masks.items():
             self.df.loc[mask, colname] = filler
         return
+
+    def fill_column_by_rules(self, rules, colname):
+        """Fills the column in one pass by the MaskRules given"""
+        self.df[colname] = rules.derive(self.df, colname)
+        return
         
 
         
@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import division, print_function, absolute_import
+
+import sys
+import os
+
+from raptors import __version__
+
+__author__ = "Jeyaraj Durairaj"
+__copyright__ = "Jeyaraj Durairaj"
+__license__ = "none"
+
+
+class IndexRegistry():
+    """Registry of the indexes the queries of raptors need,
+    declared per collection as lists of (field, direction) keys
+    """
+
+    booking_source_indexes = [
+        [ ('sales_level_3', 1), ('fiscal_period_id', 1) ],
+        [ ('fiscal_period_id', 1) ],
+        [ ('fiscal_week_id', 1) ],
+    ]
+
+    sfdc_indexes = [
+        [ ('sales_level_3', 1), ('opportunity_status', 1), ('past_due', 1) ],
+    ]
+
+    specs = {
+        'ent_dump_from_finance'     : booking_source_indexes,
+        'ent_dump_from_finance_old' : booking_source_indexes,
+        'sfdc_raw_dump'             : sfdc_indexes,
+        'sfdc_dump'                 : sfdc_indexes,
+        'booking_dump'              : [
+            [ ('sales_level_3', 1), ('fiscal_period_id', 1) ],
+            [ ('sales_level_4', 1), ('fiscal_period_id', 1) ],
+            [ ('fiscal_period_id', 1) ],
+        ],
+    }
+
+
+    @classmethod
+    def get(cls, collname):
+        """Returns the index keys of the collection, empty if not registered"""
+        return cls.specs.get(collname, [])
+
+    @classmethod
+    def collections(cls):
+        """Returns the names of the registered collections"""
+        return sorted(cls.specs)
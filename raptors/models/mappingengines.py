@@ -0,0 +1,201 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import division, print_function, absolute_import
+
+import sys
+import os
+from functools import partial
+import numpy as np
+import pandas as pd
+from raptors.helpers.exceptions.modelsexceptions import MappingRowsExceededException
+from raptors.helpers.mongoutils import Mongo
+
+from raptors import __version__
+
+__author__ = "Jeyaraj Durairaj"
+__copyright__ = "Jeyaraj Durairaj"
+__license__ = "none"
+
+
+class MergeMappingEngine():
+    """Maps the technologies, segments and unique names into the
+    dump by left joining the prepared mapper data in Pandas
+    """
+
+    prepared_before_read = False # The dump can be read while the mappers are prepared
+
+
+    def __init__(self, techmapper, segmapper, uniquenames, cache=None):
+        """Initializer for MergeMappingEngine class"""
+        self.techmapper  = techmapper
+        self.segmapper   = segmapper
+        self.uniquenames = uniquenames
+        self.cache       = cache
+        self.mappers     = [ self.techmapper, self.segmapper, self.uniquenames ]
+
+    def prepare(self):
+        """Prepares the mapper data one after another"""
+        for task in self.prepare_tasks():
+            task()
+        return
+
+    def prepare_tasks(self):
+        """Returns the independent tasks preparing every mapper"""
+        return [ partial(self._prepare, mapper) for mapper in self.mappers ]
+
+    def _prepare(self, mapper):
+        """Reads and prepares the data of a mapper"""
+        print("[Info]: Reading '{}' data".format(mapper.reader.collname))
+        mapper.read_prepared(self.cache)
+        return
+
+    def stages(self):
+        """Returns the aggregation stages mapping the dump while it
+        is read; nothing to be done in the database
+        """
+        return []
+
+    def map(self, reader):
+        """Maps the mapper data into the dump read"""
+        reader.map_technologies(self.techmapper)
+        reader.map_segments(self.segmapper)
+        reader.map_uniquenames(self.uniquenames)
+        return
+
+
+class LookupMappingEngine(MergeMappingEngine):
+    """Maps the technologies, segments and unique names into the
+    dump inside MongoDB by '$lookup' stages run while the dump is
+    read, against copies of the mapper collections prepared and
+    indexed on the mappable columns; when the columns overlap the
+    dump's values are kept
+    """
+
+    prepared_before_read = True # The dump read looks up the prepared collections
+    lookup_suffix        = '_lookup'
+    matches_field        = '_matches_{}'
+
+
+    def __init__(self, techmapper, segmapper, uniquenames, cache=None):
+        """Initializer for LookupMappingEngine class"""
+        super().__init__(techmapper, segmapper, uniquenames, cache=cache)
+
+    def _prepare(self, mapper):
+        """Prepares the collection of a mapper to be looked up"""
+        print("[Info]: Preparing '{}' data for lookup".format(mapper.reader.collname))
+        mapper.reader.materialize(mapper.lookup_pipeline(), self._lookup_collname(mapper), mapper.mappable_cols)
+        return
+
+    def stages(self):
+        """Returns the aggregation stages mapping the dump while it
+        is read; the unique names are looked up by the upper case
+        'customer_name' as the Pandas flow does
+        """
+        stages = [ { '$addFields': { 'customer_name': Mongo.make_upcase('customer_name') } } ]
+        for mapper in self.mappers:
+            stages.extend(self._lookup_stages(mapper))
+        return stages
+
+    def map(self, reader):
+        """Adds the mapper columns no document has matched as nulls and
+        checks that the lookups have not multiplied the rows of the dump
+        """
+        fields   = [ self._matches_field(mapper) for mapper in self.mappers ]
+        rows_aft = reader.df.shape[0]
+        # Every document shows up as many times as the product of its matches
+        rows_bef = int(round((1 / reader.df.loc[:, fields].prod(axis=1)).sum())) if rows_aft else 0
+        reader.delete_columns(fields)
+        for mapper in self.mappers:
+            for field in mapper.reader.field_names(self._lookup_collname(mapper)):
+                if field not in reader.df.columns:
+                    reader.df[field] = np.nan
+        reader.rows, reader.cols = reader.df.shape
+        print("[Info]: Lookup mapping of {} row(s) resulted in {} row(s) {} col(s)".format(
+            rows_bef, reader.rows, reader.cols))
+        if rows_aft != rows_bef:
+            raise MappingRowsExceededException(rows_bef, rows_aft)
+        return
+
+    def _lookup_stages(self, mapper):
+        """Returns the stages looking up one mapper collection"""
+        matched = '_mapped'
+        return [
+            { '$lookup': {
+                'from'         : self._lookup_collname(mapper),
+                'localField'   : mapper.mappable_cols,
+                'foreignField' : mapper.mappable_cols,
+                'as'           : matched,
+            } },
+            { '$addFields': { self._matches_field(mapper): { '$max': [ 1, { '$size': '$' + matched } ] } } },
+            { '$unwind': { 'path': '$' + matched, 'preserveNullAndEmptyArrays': True } },
+            { '$replaceRoot': { 'newRoot': { '$mergeObjects': [ '$' + matched, '$$ROOT' ] } } },
+            { '$project': { matched: 0 } },
+        ]
+
+    def _lookup_collname(self, mapper):
+        """Returns the name of the collection prepared for lookup"""
+        return mapper.reader.collname + self.lookup_suffix
+
+    def _matches_field(self, mapper):
+        """Returns the name of the field counting the matches of a mapper"""
+        return self.matches_field.format(mapper.reader.collname)
+
+
+class HashMappingEngine(MergeMappingEngine):
+    """Maps the technologies, segments and unique names into the dump
+    by indexing every prepared mapper once on its mappable column; the
+    keys are checked before joining and all the mapped columns are
+    attached in one pass, named the way the Pandas merges name them
+    """
+
+    suffixes = ('_x', '_y')
+
+
+    def __init__(self, techmapper, segmapper, uniquenames, cache=None):
+        """Initializer for HashMappingEngine class"""
+        super().__init__(techmapper, segmapper, uniquenames, cache=cache)
+        self.map_descs = [ 'Technology Mapping', 'Segment Mapping', 'Uniquenames Mapping' ]
+
+    def map(self, reader):
+        """Maps the mapper data into the dump read"""
+        print("Before performing Hash mapping, the dataframe contained {} row(s) {} col(s)".format(
+            reader.rows, reader.cols))
+        columns = { col: reader.df[col].array for col in reader.df.columns }
+        for mapper, map_desc in zip(self.mappers, self.map_descs):
+            key     = mapper.mappable_cols
+            indexer = self._indexer(pd.Series(columns[key]), mapper.df[key])
+            print("[Info]: {} matched {} of {} row(s)".format(map_desc, (indexer >= 0).sum(), len(indexer)))
+            for col in mapper.df.columns:
+                if col == key:
+                    continue
+                values = pd.api.extensions.take(mapper.df[col].array, indexer, allow_fill=True)
+                if col in columns:
+                    columns = { (col + self.suffixes[0] if name == col else name): vals for name, vals in columns.items() }
+                    col     = col + self.suffixes[1]
+                columns[col] = values
+        reader.df = pd.DataFrame(columns)
+        reader.rows, reader.cols = reader.df.shape
+        print("After performing Hash mapping, the dataframe contains {} row(s) {} col(s)".format(
+            reader.rows, reader.cols))
+        return
+
+    def _indexer(self, keys, mapper_keys):
+        """Returns the positions of the keys in the mapper, -1 where
+        unmatched; raises before joining when keys repeated in the
+        mapper would multiply the rows
+        """
+        index = pd.Index(mapper_keys)
+        if not index.is_unique:
+            rows_bef = len(keys)
+            rows_aft = int(keys.map(mapper_keys.value_counts(dropna=False)).fillna(1).sum())
+            if rows_aft != rows_bef:
+                raise MappingRowsExceededException(rows_bef, rows_aft)
+            index = index.drop_duplicates()
+        return index.get_indexer(keys)
+
+
+engines = {
+    'merge'  : MergeMappingEngine,
+    'lookup' : LookupMappingEngine,
+    'hash'   : HashMappingEngine,
+}
@@ -5,14 +5,23 @@ from __future__ import division, print_function, absolute_import
 import sys
 import os
 from datetime import datetime
-from pymongo import MongoClient
 import pandas as pd
 import string
 from collections import namedtuple
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from openpyxl import load_workbook
+from bson import ObjectId
 from raptors.helpers.exceptions.modelsexceptions import ExcelFileDoesNotExistException
 from raptors.helpers.exceptions.modelsexceptions import ExcelSheetDoesNotExistException
+from raptors.helpers.exceptions.modelsexceptions import FileDoesNotExistException
 from raptors.helpers.exceptions.modelsexceptions import CollectionDoesNotExistException
 from raptors.helpers.pandashelpers import DataFrameHelper
+from raptors.helpers.fiscalcalendar import FiscalCalendar
+from raptors.helpers.maskrules import MaskRules
+from raptors.helpers.cacheutils import FrameCache
+from raptors.helpers.mongoutils import Mongo, MongoClients
+from raptors.models.schemas import SchemaRegistry
 
 from raptors import __version__
 
@@ -32,25 +41,77 @@ class Reader(DataFrameHelper):
         self.reader = reader
         self.df     = None
 
-    def read(self, qry={}, loop_params=None):
+    def read(self, qry={}, loop_params=None, stages=None, fields=None):
         """Hook method to read the data irrespective of the engine 
-        as abstracted interface
+        as abstracted interface; the stages, if any, are run by the
+        engine on the data read, which is limited to the fields, if any
         """
+        opts = { key: val for key, val in [ ('stages', stages), ('fields', fields) ] if val }
+        read = partial(self.reader.read, **opts) if opts else self.reader.read
         if loop_params is None:
-            self.df = self.reader.read(qry)
+            self.df = read(qry)
         else:
-            params = loop_params['params']
-            field  = loop_params['field']
-            self.df = pd.DataFrame()
-            for param in params:
-                qry[field] = param
-                dframe     = self.reader.read(qry)
-                if not dframe.empty:
-                    self.df = self.df.append(dframe)
+            self.df = self._read_looped(read, qry, loop_params)
         self.rows, self.cols = self.df.shape
         print("{} row(s) {} col(s) have been read.".format(self.rows, self.cols))
         return
 
+    def _read_looped(self, read, qry, loop_params):
+        """Reads the data for all the params of the loop field, either
+        by one '$in' query or, with more than one worker, by one query
+        per param fetched concurrently, and concatenates them once
+        """
+        params  = loop_params['params']
+        field   = loop_params['field']
+        workers = loop_params.get('workers', 1)
+        if workers > 1:
+            qrys = [ dict(qry, **{ field: param }) for param in params ]
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                frames = list(pool.map(read, qrys))
+        else:
+            frames = [ read(dict(qry, **{ field: { '$in': list(params) } })) ]
+        frames = [ dframe for dframe in frames if not dframe.empty ]
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True, sort=False)
+
+    def read_chunks(self):
+        """Hook method to read the data chunk by chunk irrespective
+        of the engine as abstracted interface; each chunk becomes
+        the current dataframe before it is yielded
+        """
+        for dframe in self.reader.read_chunks():
+            self.df = dframe
+            self.rows, self.cols = self.df.shape
+            print("{} row(s) {} col(s) have been read.".format(self.rows, self.cols))
+            yield self.df
+
+    def prepare(self):
+        """Hook method to prepare the data read before it is used;
+        nothing to prepare by default
+        """
+        return
+
+    def read_prepared(self, cache=None):
+        """Hook method to read and prepare the data, served from the
+        cache as long as the version of the source is unchanged
+        """
+        if cache is None:
+            self.read()
+            self.prepare()
+            return
+        key = FrameCache.make_key(type(self).__name__, self.reader.identity(), self.reader.version())
+        df  = cache.load(key)
+        if df is not None:
+            print("[Info]: Prepared '{}' data found in cache...".format(self.reader.collname))
+            self.df = df
+            self.rows, self.cols = self.df.shape
+            return
+        self.read()
+        self.prepare()
+        cache.store(key, self.df)
+        return
+
     def read_dict(self, qry={}):
         """Hook method to read the data in dict format 
         irrespective of the engine as abstracted interface
@@ -82,17 +143,24 @@ class AggregationReader(Reader):
     """
 
 
-    def __init__(self, reader):
+    def __init__(self, reader, workers=4):
         """Initializier for AggregationReader class"""
         super().__init__(reader)
-        self.df = pd.DataFrame()
-
-    def read(self, agg_pipes=None):
-        """Overridden hook method to read data using MongoDB aggregation"""
-        for pipe in agg_pipes:
-            dframe = self.reader.agg(pipe)
-            if not dframe.empty:
-                self.df = self.df.append(dframe)
+        self.df      = pd.DataFrame()
+        self.workers = workers if workers else 1
+
+    def read(self, agg_pipes=None, fields=None):
+        """Overridden hook method to read data using MongoDB aggregation,
+        running the independent pipelines concurrently; the fields they
+        output type the Arrow reads
+        """
+        workers = max(1, min(self.workers, len(agg_pipes)))
+        schema  = self.reader.arrow_schema(fields)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            frames = [ dframe for dframe in pool.map(lambda pipe: self.reader.agg(pipe, schema), agg_pipes) 
+                if not dframe.empty ]
+        if frames:
+            self.df = pd.concat(frames, ignore_index=True, sort=False)
         self.rows, self.cols = self.df.shape
         print("{} row(s) {} col(s) have been read.".format(self.rows, self.cols))
         return
@@ -103,6 +171,15 @@ class SalesDumpReader(Reader):
     functionalities of 'ent_dump_from_finance' & 'sfdc_raw_dump' collections
     """
 
+    required_fields = None # All the fields are needed
+    column_rules    = {
+        'sales_level_4' : MaskRules([
+            (MaskRules.isin('sales_level_4', 'INDIA_COMM_WST', 'INDIA_COMM_STH'), 'INDIA_COMM_SW_GEO'),
+            (MaskRules.equals('sales_level_4', 'INDIA_COMM_NORTH_EAST'), 'INDIA_COMM_NE_GEO'),
+            (MaskRules.equals('sales_level_4', 'INDIA_COMM_1-MISCL4'), 'INDIA_COMM_MISC'),
+        ], keep=True),
+    }
+
 
     def __init__(self, reader):
         """Initializer for Readable class"""
@@ -143,16 +220,14 @@ class SalesDumpReader(Reader):
         self.left_join(uniquenames.df, on=uniquenames.mappable_cols, map_desc='Uniquenames Mapping')
         return
 
+    def sl4_switch(self):
+        """Returns the $switch expression correcting sales_level_4 in the database"""
+        return self.column_rules['sales_level_4'].switch('sales_level_4')
+
     def validate_sl4(self):
         """Public method to correct sales_level_4"""
         print("[Info]: Validating SL4 column (Reassigning into one unique)...")
-        base_colname = 'sales_level_4'
-        masks = { 
-            'INDIA_COMM_SW_GEO' : ((self.df.loc[:, base_colname] == 'INDIA_COMM_WST') | (self.df.loc[:, base_colname] == 'INDIA_COMM_STH')),
-            'INDIA_COMM_NE_GEO' : (self.df.loc[:, base_colname] == 'INDIA_COMM_NORTH_EAST'),
-            'INDIA_COMM_MISC'   : (self.df.loc[:, base_colname] == 'INDIA_COMM_1-MISCL4')
-        }
-        self.fill_column_by_mask(masks, base_colname)
+        self.fill_column_by_rules(self.column_rules['sales_level_4'], 'sales_level_4')
         return
 
 
@@ -161,6 +236,21 @@ class EntBookingDumpReader(SalesDumpReader):
     readable functionalities of 'ent_dump_from_finance' collection
     """
 
+    # Fields used by the cleanup, the mapping and the 'booking_dump' reports
+    required_fields = [
+        'fiscal_quarter_id', 'fiscal_period_id', 'fiscal_week_id', 'customer_name', 'partner_name',
+        'sales_level_1', 'sales_level_2', 'sales_level_3', 'sales_level_4', 'sales_level_5', 'sales_level_6',
+        'internal_sub_business_entity_name', 'services_indicator', 'bookings_adjustments_code',
+        'bookings_adjustments_type', 'erp_deal_id', 'tbm', 'recurring_offer_flag', 'product_classification',
+        'grp_ver', 'grp_ver2', 'booking_net', 'standard_cost', 'tms_sales_allocated_bookings_base_list',
+    ]
+    column_rules    = {
+        **SalesDumpReader.column_rules,
+        'cloud_flag'   : MaskRules([ (MaskRules.startswith('bookings_adjustments_code', 'L'), 'N') ], default='Y'),
+        'tier_code'    : MaskRules([ (MaskRules.startswith('bookings_adjustments_type', 'POS', 'DSV'), 'POS') ], default='New Paper'),
+        'deal_id_desc' : MaskRules([ (MaskRules.equals('erp_deal_id', 0), 'Non Deal ID') ], default='Deal ID'),
+    }
+
 
     def __init__(self, reader):
         """Initializer for Readable class"""
@@ -175,6 +265,32 @@ class EntBookingDumpReader(SalesDumpReader):
         self.rename_columns(self.cols_renamable)
         return
 
+    def derivation_stages(self):
+        """Returns the aggregation stages deriving the columns in the
+        database the way the make_*_column methods and validate_sl4 do
+        """
+        return [ { '$addFields': {
+            'customer_name'   : Mongo.make_upcase('customer_name'),
+            'partner_name'    : Mongo.make_upcase('partner_name'),
+            'fiscal_year_id'  : Mongo.make_head('fiscal_quarter_id', 4),
+            'fiscal_month_id' : Mongo.make_tail('fiscal_period_id', 2),
+            'prod_serv'       : Mongo.make_map('services_indicator', { 'N': 'products', 'Y': 'services' }),
+            'cloud_flag'      : self.column_rules['cloud_flag'].switch('cloud_flag'),
+            'tier_code'       : self.column_rules['tier_code'].switch('tier_code'),
+            'deal_id_desc'    : self.column_rules['deal_id_desc'].switch('deal_id_desc'),
+            'sales_level_4'   : self.sl4_switch(),
+        } } ]
+
+    def make_fiscal_columns(self):
+        """Public method to make fiscal_year_id and fiscal_month_id at once
+        from the fiscal calendar of fiscal_quarter_id and fiscal_period_id
+        """
+        FiscalCalendar([ 'fiscal_quarter_id', 'fiscal_period_id' ]).fill(self.df, {
+            'fiscal_year_id'  : lambda key: key.fiscal_quarter_id[:4],
+            'fiscal_month_id' : lambda key: str(key.fiscal_period_id)[-2:],
+        })
+        return
+
     def make_fiscalyearid_column(self):
         """Public method to make fiscal_year_id from fiscal_quarter_id"""
         self.make_new_column(lambda x: x[:4], 'fiscal_quarter_id', new_colname='fiscal_year_id')
@@ -199,31 +315,19 @@ class EntBookingDumpReader(SalesDumpReader):
     def make_cloudflag_column(self):
         """Public method to create 'cloud_flag' column"""
         print("[Info]: Making 'cloud_flag' column...")
-        base_colname = 'bookings_adjustments_code'
-        masks = { 
-            'N': self.df.loc[:, base_colname].str.startswith('L'),
-            'Y': (-self.df.loc[:, base_colname].str.startswith('L'))
-        }
-        self.fill_column_by_mask(masks, 'cloud_flag')
+        self.fill_column_by_rules(self.column_rules['cloud_flag'], 'cloud_flag')
         return
         
     def make_tiercode_column(self):
         """Public method to create 'tier_code' column"""
         print("[Info]: Making 'tier_code' column...")
-        base_colname = 'bookings_adjustments_type'
-        masks = { 
-            'POS'       : ((self.df.loc[:, base_colname].str.startswith('POS')) | (self.df.loc[:, base_colname].str.startswith('DSV'))),
-            'New Paper' : (-((self.df.loc[:, base_colname].str.startswith('POS')) | (self.df.loc[:, base_colname].str.startswith('DSV'))))
-        }
-        self.fill_column_by_mask(masks, 'tier_code')
+        self.fill_column_by_rules(self.column_rules['tier_code'], 'tier_code')
         return
         
     def make_dealid_desc_column(self):
         """Public method to create 'dealid_desc' column"""
         print("[Info]: Making 'deal_id_desc' column...")
-        base_colname = 'erp_deal_id'
-        masks = { 'Non Deal ID': (self.df.loc[:, base_colname] == 0), 'Deal ID': (-(self.df.loc[:, base_colname] == 0)) }
-        self.fill_column_by_mask(masks, 'deal_id_desc')
+        self.fill_column_by_rules(self.column_rules['deal_id_desc'], 'deal_id_desc')
         return
         
     def validate_mapping(self):
@@ -266,6 +370,13 @@ class SFDCRawDumpReader(SalesDumpReader):
     readable functionalities of 'sfdc_raw_dump' collection
     """
 
+    column_rules = {
+        **SalesDumpReader.column_rules,
+        'past_due' : MaskRules([
+            (MaskRules.less('no_of_days_past_ebd', 0), 'NEGATIVE'),
+            (MaskRules.greater_equal('no_of_days_past_ebd', 0), 'ZERO_AND_POSITIVE'),
+        ], keep=True),
+    }
 
     def __init__(self, reader):
         """Initializer for Readable class"""
@@ -276,15 +387,45 @@ class SFDCRawDumpReader(SalesDumpReader):
         }
         self.ColMapper = namedtuple('Config', [ 'colname', 'mapper' ])
 
+    def derivation_stages(self):
+        """Returns the aggregation stages deriving the columns in the
+        database the way the make_*_column methods do
+        """
+        year    = Mongo.make_tail('fiscal_period', 4)
+        quarter = Mongo.make_head('fiscal_period', 2)
+        month   = Mongo.make_zfill('fiscal_month', 2)
+        return [ { '$addFields': {
+            'customer_name'     : Mongo.make_upcase('customer_name'),
+            'fiscal_year_id'    : year,
+            'fiscal_quarter'    : quarter,
+            'fiscal_quarter_id' : { '$concat': [ year, quarter ] },
+            'fiscal_month_id'   : month,
+            'fiscal_week_id'    : { '$toLong': { '$concat': [ year, month, Mongo.make_string('fiscal_week_of_month') ] } },
+            'fiscal_period_id'  : { '$toLong': { '$concat': [ year, month ] } },
+            'prod_serv'         : Mongo.make_map('technology_service_code', { 'Technology': 'products', 'Service': 'services' }),
+            'past_due'          : self.column_rules['past_due'].switch('past_due'),
+        } } ]
+
     def make_pastdue_column(self):
         """Public method to validate 'past_due' column"""
         print("[Info]: Validating 'past_due' column...")
-        base_colname = 'no_of_days_past_ebd'
-        masks = { 
-            'NEGATIVE'           : (self.df.loc[:, base_colname] < 0),
-            'ZERO_AND_POSITIVE'  : (self.df.loc[:, base_colname] >= 0),
-        }
-        self.fill_column_by_mask(masks, 'past_due')
+        self.fill_column_by_rules(self.column_rules['past_due'], 'past_due')
+        return
+
+    def make_fiscal_columns(self):
+        """Public method to make all the fiscal columns at once from the fiscal
+        calendar of fiscal_period, fiscal_month and fiscal_week_of_month
+        """
+        year  = lambda key: str(key.fiscal_period)[-4:]
+        month = lambda key: str(key.fiscal_month).zfill(2)
+        FiscalCalendar([ 'fiscal_period', 'fiscal_month', 'fiscal_week_of_month' ]).fill(self.df, {
+            'fiscal_year_id'    : year,
+            'fiscal_quarter'    : lambda key: str(key.fiscal_period)[:2],
+            'fiscal_quarter_id' : lambda key: year(key) + str(key.fiscal_period)[:2],
+            'fiscal_month_id'   : month,
+            'fiscal_week_id'    : lambda key: int(year(key) + month(key) + str(key.fiscal_week_of_month)),
+            'fiscal_period_id'  : lambda key: int(year(key) + month(key)),
+        }, dtypes={ 'fiscal_week_id': 'int64', 'fiscal_period_id': 'int64' })
         return
 
     def make_fiscalyearid_column(self):
@@ -379,6 +520,21 @@ class TechSpec1Reader(Reader):
         """Initializer for TechSpec1Reader class"""
         super().__init__(reader)
 
+    def prepare(self):
+        """Prepares the data for mapping"""
+        self.remove_dedundancy()
+        return
+
+    def lookup_pipeline(self):
+        """Returns the aggregation pipeline preparing the data for
+        mapping in the database the way prepare does
+        """
+        return [
+            { '$sort': { '_id': 1 } },
+            { '$group': { '_id': '$' + self.mappable_cols, 'doc': { '$first': '$$ROOT' } } },
+            { '$replaceRoot': { 'newRoot': '$doc' } },
+        ]
+
     def remove_dedundancy(self):
         """Removes the duplicate entries in the data"""
         self.remove_duplicates(self.mappable_cols)
@@ -400,9 +556,9 @@ class BookingDumpReader(AggregationReader):
     readabve functionalities of 'booking_dump' collection
     """
     
-    def __init__(self, reader):
+    def __init__(self, reader, workers=4):
         """Initializer for BookingDumpReader class"""
-        super().__init__(reader)
+        super().__init__(reader, workers=workers)
         
 
 class SFDCDumpReader(SalesDumpReader):
@@ -427,6 +583,12 @@ class SL5ToSegmentsReader(Reader):
         """Initializer for SL5ToSegmentReader class"""
         super().__init__(reader)
 
+    def lookup_pipeline(self):
+        """Returns the aggregation pipeline preparing the data for
+        mapping in the database; nothing to prepare
+        """
+        return []
+
     def remove_dedundancy(self):
         """Removes the duplicate entries in the data"""
         self.remove_duplicates(self.mappable_cols)
@@ -447,6 +609,31 @@ class MasterUniqueNamesReader(Reader):
         """Initializer for TechSpec1Reader class"""
         super().__init__(reader)
 
+    def prepare(self):
+        """Prepares the data for mapping"""
+        self.upcase_names()
+        self.upcase_accnames()
+        self.upcase_grpnames()
+        self.remove_dedundancy()
+        self.transform_names_to_customername()
+        return
+
+    def lookup_pipeline(self):
+        """Returns the aggregation pipeline preparing the data for
+        mapping in the database the way prepare does
+        """
+        return [
+            { '$sort': { '_id': 1 } },
+            { '$group': { '_id': { '$toUpper': '$' + self.redundant_cols }, 'doc': { '$first': '$$ROOT' } } },
+            { '$replaceRoot': { 'newRoot': '$doc' } },
+            { '$addFields': {
+                self.mappable_cols : Mongo.make_upcase(self.redundant_cols),
+                'acc_name'         : Mongo.make_upcase('acc_name'),
+                'grp_name'         : Mongo.make_upcase('grp_name'),
+            } },
+            { '$project': { self.redundant_cols: 0 } },
+        ]
+
     def remove_dedundancy(self):
         """Removes the duplicate entries in the data"""
         self.remove_duplicates(self.redundant_cols)
@@ -477,23 +664,189 @@ class MasterUniqueNamesReader(Reader):
 class MongoReader():
     """Reads data from MongoDB database
     """
+
+    samples_per_partition = 100
+    arrow_types           = { 'str': str, 'int': int, 'float': float } # by the declared dtypes without their sizes
     
 
-    def __init__(self, collname, dbname='ccsdm', host='localhost', port=27017):
+    def __init__(self, collname, dbname='ccsdm', host='localhost', port=27017, batchsize=1000, read_preference=None,
+            arrow=False, partitions=1, partition_field='_id'):
         """Initializer for MongoReader class"""
         self.dbname, self.collname = dbname, collname
-        self.client                = MongoClient(host, port)
-        self.db                    = self.client[dbname]
+        self.host, self.port       = host, port
+        self.client                = MongoClients.get(host, port)
+        self.db                    = self.client.get_database(dbname, 
+                read_preference=MongoClients.read_preference(read_preference))
         self.coll                  = self.db[collname]
-        self.hideable              = { '_id': 0, 'timestamp': 0 }
+        self.hideable              = { '_id': 0, 'timestamp': 0, 'row_hash': 0 }
+        self.batchsize             = batchsize
+        self.arrow                 = self._arrow_api() if arrow else None
+        self.partitions            = partitions if partitions else 1
+        self.partition_field       = partition_field
+
+    def read(self, qry, stages=None, fields=None):
+        """Reads and returns the data as Pandas dataframe; with stages,
+        the matching documents are read through them by aggregation;
+        with fields, only those leave the server; with partitions, the
+        ranges of the partition field are read concurrently
+        """
+        if self.partitions > 1:
+            return self._read_partitioned(qry, stages, fields)
+        return self._read_one(qry, stages, fields)
 
-    def read(self, qry):
-        """Reads and returns the data as Pandas dataframe"""
-        return pd.DataFrame(list(self.coll.find(qry, self.hideable)))
+    def _read_partitioned(self, qry, stages=None, fields=None):
+        """Reads the ranges of the partition field split by sampled
+        points concurrently, each over its own cursor
+        """
+        qrys = [ { '$and': [ qry, rng ] } if qry else rng for rng in self._partition_ranges(qry) ]
+        print("[Info]: Reading '{}' in {} partition(s) of '{}'...".format(self.collname, len(qrys), 
+            self.partition_field))
+        with ThreadPoolExecutor(max_workers=len(qrys)) as pool:
+            frames = list(pool.map(lambda part_qry: self._read_one(part_qry, stages, fields), qrys))
+        frames = [ dframe for dframe in frames if not dframe.empty ]
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True, sort=False)
+
+    def _partition_ranges(self, qry):
+        """Returns the queries of the disjoint ranges covering the whole
+        collection; the first range also takes the documents missing
+        the field or holding values of another type
+        """
+        field  = self.partition_field
+        size   = self.partitions * self.samples_per_partition
+        pipe   = ([ { '$match': qry } ] if qry else []) + [ { '$sample': { 'size': size } }, { '$project': { field: 1 } } ]
+        kinds  = (ObjectId,) if field == '_id' else (int, float)
+        values = sorted({ doc[field] for doc in self.coll.aggregate(pipe, allowDiskUse=True) 
+            if isinstance(doc.get(field), kinds) and not isinstance(doc.get(field), bool) })
+        if not values:
+            return [ {} ]
+        points = sorted({ values[len(values) * part // self.partitions] for part in range(1, self.partitions) })
+        ranges = [ { field: { '$not': { '$gte': points[0] } } } ]
+        for lo, hi in zip(points[:-1], points[1:]):
+            ranges.append({ field: { '$gte': lo, '$lt': hi } })
+        ranges.append({ field: { '$gte': points[-1] } })
+        return ranges
+
+    def _read_one(self, qry, stages=None, fields=None):
+        """Reads the matching documents over one cursor"""
+        if stages:
+            pushdown = [ { '$project': self._projection(fields) } ] if fields else []
+            return self.agg([ { '$match': qry } ] + pushdown + list(stages) + [ { '$project': self.hideable } ])
+        if self.arrow and SchemaRegistry.stored(self.collname):
+            return self._read_arrow(qry, fields)
+        return pd.DataFrame(list(self.coll.find(qry, self._projection(fields))))
+
+    def _read_arrow(self, qry, fields=None):
+        """Reads the fields stored by one type into Arrow columns, and
+        the others, like 'erp_deal_id', document by document joined on
+        '_id'; without fields, the typed ones are those of a document.
+        The documents are decoded when their values are not of the types
+        """
+        types, untyped = self._arrow_types(fields if fields else self.field_names())
+        if not types:
+            return pd.DataFrame(list(self.coll.find(qry, self._projection(fields))))
+        if fields and not untyped:
+            rest = None
+        elif fields:
+            rest = { field: 1 for field in untyped }
+        else:
+            rest = { **{ field: 0 for field in types }, **self._projection(), '_id': 1 }
+        try:
+            schema = self.arrow.Schema({ **types, '_id': ObjectId } if rest else types)
+            df     = self.arrow.find_pandas_all(self.coll, qry, schema=schema, batch_size=self.batchsize)
+        except TypeError as e:
+            print("[Warning]: {} in '{}', decoding documents".format(e, self.collname))
+            return pd.DataFrame(list(self.coll.find(qry, self._projection(fields))))
+        if rest is None:
+            return df
+        others = pd.DataFrame(list(self.coll.find(qry, rest)))
+        if others.empty:
+            return df.drop(columns='_id')
+        df['_id'] = df['_id'].astype(object)
+        return df.merge(others, on='_id', how='left').drop(columns='_id')
+
+    def _arrow_api(self):
+        """Returns the API of pymongoarrow, which decodes the cursor batches
+        straight into Arrow columns, or None when it is not installed
+        """
+        try:
+            from pymongoarrow import api
+        except ImportError:
+            print("[Warning]: 'pymongoarrow' is not installed, reading '{}' document by document".format(
+                self.collname))
+            return None
+        return api
+
+    def _arrow_types(self, fields):
+        """Returns the Arrow types of the fields stored by one type in
+        the collection, and the other fields
+        """
+        dtypes  = SchemaRegistry.stored(self.collname)
+        types   = { field: self.arrow_types.get(str(dtypes.get(field, '')).rstrip('0123456789')) for field in fields }
+        untyped = [ field for field, arrow_type in types.items() if arrow_type is None ]
+        return { field: arrow_type for field, arrow_type in types.items() if arrow_type is not None }, untyped
+
+    def arrow_schema(self, fields=None):
+        """Returns the pymongoarrow Schema typing the fields for the Arrow
+        reads; None without the Arrow reads or when any field is untyped,
+        as an inferred schema drops the fields missing in the first
+        documents
+        """
+        if not self.arrow or not fields:
+            return None
+        types, untyped = self._arrow_types(fields)
+        if untyped:
+            print("[Info]: No stored types for {} in '{}', decoding documents".format(untyped, self.collname))
+            return None
+        return self.arrow.Schema(types)
+
+    def _projection(self, fields=None):
+        """Returns the projection of the fields, or of all but the
+        hideable ones when no fields are given
+        """
+        if not fields:
+            return dict(self.hideable)
+        return { '_id': 0, **{ field: 1 for field in fields } }
+
+    def identity(self):
+        """Returns what identifies the collection read"""
+        return self.host, self.port, self.dbname, self.collname
+
+    def version(self):
+        """Cheap probe of the collection's version: document count and
+        latest '_id', both served without a scan; the collections are
+        reloaded by inserts, which always bring new '_id's
+        """
+        latest_id = self.coll.find_one({}, { '_id': 1 }, sort=[ ('_id', -1) ])
+        return self.coll.estimated_document_count(), str(latest_id['_id']) if latest_id else None
 
-    def agg(self, pipe):
-        """Reads and returns the data as Pandas dataframe using aggregation"""
-        return pd.DataFrame(list(self.coll.aggregate(pipe)))
+    def agg(self, pipe, schema=None):
+        """Reads and returns the data as Pandas dataframe using aggregation;
+        the output is decoded into Arrow columns only by an explicit schema
+        """
+        if self.arrow and schema is not None:
+            try:
+                return self.arrow.aggregate_pandas_all(self.coll, list(pipe), schema=schema, allowDiskUse=True)
+            except TypeError as e:
+                print("[Warning]: {} in '{}', decoding documents".format(e, self.collname))
+        return pd.DataFrame(list(self.coll.aggregate(pipe, allowDiskUse=True, batchSize=self.batchsize)))
+
+    def field_names(self, collname=None):
+        """Returns the field names of a document of the collection,
+        or of another one of the same database, but the hideable ones
+        """
+        coll = self.db[collname] if collname else self.coll
+        doc  = coll.find_one({}, self._projection())
+        return list(doc) if doc else []
+
+    def materialize(self, pipe, collname, key):
+        """Writes the output of the aggregation into a collection
+        of the same database, indexed on the key
+        """
+        self.coll.aggregate(list(pipe) + [ { '$out': collname } ], allowDiskUse=True)
+        self.db[collname].create_index(key)
+        return
 
     def trash_one(self, qry):
         """Removes just one document from the collection"""
@@ -513,23 +866,101 @@ class MongoReader():
         return
 
 
+class ColumnFilter():
+    """Callable telling the source readers whether a column is
+    to be parsed, i.e. not among the dropped column names
+    """
+
+
+    def __init__(self, dropcols=None):
+        """Initializer for ColumnFilter class"""
+        self.dropcols = set(str(col).lower() for col in dropcols) if dropcols else set()
+
+    def __call__(self, col):
+        """Returns True if the column is to be kept"""
+        return str(col).lower() not in self.dropcols
+
+    def keep(self, cols):
+        """Returns the columns to be kept"""
+        return [ col for col in cols if self(col) ]
+
+
 class ExcelReader():
     """Reads data from XLSX files
     """
 
 
-    def __init__(self, filepath, sheetname):
+    def __init__(self, filepath, sheetname, chunksize=50000, cache=None, dropcols=None, schema=None):
         """Initializer for ExcelReader class"""
         self.filepath  = filepath
         self.sheetname = sheetname
+        self.chunksize = chunksize
+        self.cache     = cache
+        self.colfilter = ColumnFilter(dropcols)
+        self.schema    = schema
 
     def read(self, qry=None):
-        """Reading data and returns as Pandas dataframe"""
-        if self.sheetname is not None:
-            xl = pd.ExcelFile(self.filepath)
-            return xl.parse(sheetname)
-        else:
-            return pd.read_excel(self.filepath)
+        """Reading data and returns as Pandas dataframe, served from
+        the parsed-workbook cache while the file is unchanged
+        """
+        if self.cache is None:
+            return self._parse()
+        key = self._cache_key()
+        df  = self.cache.load(key)
+        if df is not None:
+            print("[Info]: Parsed workbook found in cache...")
+            return df
+        df = self._parse()
+        self.cache.store(key, df)
+        return df
+
+    def _cache_key(self):
+        """Makes the cache key from the file's identity and the sheet"""
+        stat = os.stat(self.filepath)
+        schema = self.schema.signature() if self.schema is not None else None
+        return FrameCache.make_key(os.path.abspath(self.filepath), stat.st_size, stat.st_mtime_ns, self.sheetname, 
+                sorted(self.colfilter.dropcols), schema)
+
+    def _parse(self):
+        """Parses the workbook, skipping the dropped columns, and
+        returns as Pandas dataframe typed by the schema
+        """
+        sheetname = self.sheetname if self.sheetname is not None else 0
+        usecols   = self.colfilter if self.colfilter.dropcols else None
+        return self._coerce(pd.read_excel(self.filepath, sheet_name=sheetname, usecols=usecols))
+
+    def _coerce(self, df):
+        """Applies the schema, if any, to the parsed dataframe"""
+        if self.schema is not None:
+            self.schema.coerce(df)
+        return df
+
+    def read_chunks(self, qry=None):
+        """Reads the sheet row by row in read-only mode and yields
+        Pandas dataframes of at most 'chunksize' rows
+        """
+        wb = load_workbook(self.filepath, read_only=True, data_only=True)
+        try:
+            ws     = wb[self.sheetname] if self.sheetname is not None else wb.worksheets[0]
+            rows   = ws.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            header = [ col if col is not None else "Unnamed: {}".format(i) for i, col in enumerate(header) ]
+            kept   = [ i for i, col in enumerate(header) if self.colfilter(col) ]
+            header = [ header[i] for i in kept ]
+            chunk  = []
+            for row in rows:
+                if all(cell is None for cell in row):
+                    continue
+                chunk.append([ row[i] if i < len(row) else None for i in kept ])
+                if len(chunk) >= self.chunksize:
+                    yield self._coerce(pd.DataFrame.from_records(chunk, columns=header))
+                    chunk = []
+            if chunk:
+                yield self._coerce(pd.DataFrame.from_records(chunk, columns=header))
+        finally:
+            wb.close()
 
     def validate(self):
         """Validates the Excel file"""
@@ -554,7 +985,124 @@ class ExcelReader():
         return
 
 
+class CSVReader():
+    """Reads data from CSV files
+    """
+
+
+    def __init__(self, filepath, sheetname=None, chunksize=50000, dtypes=None, dropcols=None, schema=None):
+        """Initializer for CSVReader class"""
+        self.filepath  = filepath
+        self.sheetname = sheetname
+        self.chunksize = chunksize
+        self.dtypes    = dtypes
+        self.colfilter = ColumnFilter(dropcols)
+        self.schema    = schema
+
+    def read(self, qry=None):
+        """Reading data chunk by chunk and returns as Pandas dataframe"""
+        return pd.concat(self.read_chunks(), ignore_index=True)
+
+    def read_chunks(self, qry=None):
+        """Yields Pandas dataframes of at most 'chunksize' rows"""
+        usecols = self.colfilter if self.colfilter.dropcols else None
+        for chunk in pd.read_csv(self.filepath, chunksize=self.chunksize, dtype=self.dtypes, usecols=usecols):
+            if self.schema is not None:
+                self.schema.coerce(chunk)
+            yield chunk
+
+    @staticmethod
+    def read_header(filepath):
+        """Returns the column names of the CSV file"""
+        return pd.read_csv(filepath, nrows=0).columns.tolist()
 
+    def validate(self):
+        """Validates the CSV file"""
+        if not os.path.isfile(self.filepath):
+            raise FileDoesNotExistException(self.filepath)
+        return
+
+
+class ParquetReader():
+    """Reads data from Parquet files
+    """
+
+
+    def __init__(self, filepath, sheetname=None, chunksize=50000, dropcols=None, schema=None):
+        """Initializer for ParquetReader class"""
+        self.filepath  = filepath
+        self.sheetname = sheetname
+        self.chunksize = chunksize
+        self.colfilter = ColumnFilter(dropcols)
+        self.schema    = schema
+
+    def read(self, qry=None):
+        """Reading the kept columns and returns as Pandas dataframe"""
+        return self._coerce(pd.read_parquet(self.filepath, columns=self._columns()))
+
+    def _coerce(self, df):
+        """Applies the schema, if any, to the dataframe"""
+        if self.schema is not None:
+            self.schema.coerce(df)
+        return df
+
+    def read_chunks(self, qry=None):
+        """Yields Pandas dataframes of at most 'chunksize' rows"""
+        import pyarrow.parquet as pq
+        pqfile = pq.ParquetFile(self.filepath)
+        for batch in pqfile.iter_batches(batch_size=self.chunksize, columns=self._columns()):
+            yield self._coerce(batch.to_pandas())
+
+    def _columns(self):
+        """Returns the kept column names or None for all the columns"""
+        if not self.colfilter.dropcols:
+            return None
+        import pyarrow.parquet as pq
+        return self.colfilter.keep(pq.read_schema(self.filepath).names)
+
+    def validate(self):
+        """Validates the Parquet file"""
+        if not os.path.isfile(self.filepath):
+            raise FileDoesNotExistException(self.filepath)
+        return
+
+
+class MultiSourceReader():
+    """Reads data from several source files/sheets, parsing them
+    in parallel worker processes
+    """
+
+
+    def __init__(self, readers, workers=None):
+        """Initializer for MultiSourceReader class"""
+        self.readers = readers
+        self.workers = workers if workers else os.cpu_count()
+
+    def read(self, qry=None):
+        """Parses all the sources in a process pool and returns
+        them as one Pandas dataframe
+        """
+        workers = min(self.workers, len(self.readers))
+        print("[Info]: Parsing {} source(s) with {} process(es)...".format(len(self.readers), workers))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            frames = list(pool.map(read_source, self.readers))
+        return pd.concat(frames, ignore_index=True, sort=False)
+
+    def read_chunks(self, qry=None):
+        """Yields the chunks of every source one after another"""
+        for reader in self.readers:
+            for chunk in reader.read_chunks():
+                yield chunk
+
+    def validate(self):
+        """Validates all the sources"""
+        for reader in self.readers:
+            reader.validate()
+        return
 
 
+def read_source(reader):
+    """Reads one source from a worker process of MultiSourceReader"""
+    print("[Info]: Parsing {} {}...".format(reader.filepath, reader.sheetname if reader.sheetname else ''))
+    return reader.read()
 
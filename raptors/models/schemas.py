@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import division, print_function, absolute_import
+
+import sys
+import os
+import pandas as pd
+
+from raptors import __version__
+
+__author__ = "Jeyaraj Durairaj"
+__copyright__ = "Jeyaraj Durairaj"
+__license__ = "none"
+
+
+class Schema():
+    """Declares the dtypes and the fill values of the known
+    columns of a collection; declared string columns are filled
+    with '' rather than the 0 undeclared columns are filled with
+    """
+
+    default_fills = { 'str': '' }
+
+
+    def __init__(self, dtypes, fills=None, default_fill=0):
+        """Initializer for Schema class"""
+        self.dtypes       = dtypes
+        self.fills        = fills if fills else {}
+        self.default_fill = default_fill
+
+    def fill_value(self, col):
+        """Returns the fill value of a declared column"""
+        col = str(col).lower()
+        if col in self.fills:
+            return self.fills[col]
+        return self.default_fills.get(self.dtypes[col], self.default_fill)
+
+    def resolve(self, renames):
+        """Returns the schema also declaring the source column names
+        which are renamed into the declared ones
+        """
+        dtypes = dict(self.dtypes)
+        fills  = dict(self.fills)
+        for col, new_col in renames.items():
+            if new_col in self.dtypes:
+                dtypes[str(col).lower()] = self.dtypes[new_col]
+                if new_col in self.fills:
+                    fills[str(col).lower()] = self.fills[new_col]
+        return Schema(dtypes, fills=fills, default_fill=self.default_fill)
+
+    def signature(self):
+        """Returns a stable description of the schema"""
+        return sorted(self.dtypes.items()), sorted((col, repr(val)) for col, val in self.fills.items())
+
+    def declared(self, cols):
+        """Returns the declared ones out of the columns"""
+        return [ col for col in cols if str(col).lower() in self.dtypes ]
+
+    def fills_for(self, cols):
+        """Returns the fill values of the declared ones out of the columns"""
+        return { col: self.fill_value(col) for col in self.declared(cols) }
+
+    def csv_dtypes(self, cols):
+        """Returns the dtypes a CSV parser takes up front for the declared
+        string columns; the numeric ones are left to coerce, which fills
+        the values that are not numbers instead of failing the parse
+        """
+        return { col: str for col in self.declared(cols) if self.dtypes[str(col).lower()] == 'str' }
+
+    def coerce(self, df):
+        """Fills and casts the declared columns of the dataframe in place"""
+        for col in self.declared(df.columns):
+            df[col] = self._coerce_series(df[col], self.dtypes[str(col).lower()], self.fill_value(col), col)
+        return df
+
+    def _coerce_series(self, series, dtype, fill, col=None):
+        """Returns the series filled and cast into the dtype, warning
+        about the values of numeric columns which are not numbers
+        """
+        if dtype == 'str':
+            if pd.api.types.is_float_dtype(series) and (series.dropna() % 1 == 0).all():
+                series = series.astype('Int64')
+            return series.astype(object).where(series.notna(), fill).astype(str)
+        numbers = pd.to_numeric(series, errors='coerce')
+        invalid = int((numbers.isna() & series.notna()).sum())
+        if invalid:
+            print("[Warning]: {} value(s) of '{}' are not numbers and have been filled with {}".format(
+                invalid, col, fill))
+        return numbers.fillna(fill).astype(dtype)
+
+
+class SchemaRegistry():
+    """Registry of the schemas of the collections loaded from the dumps
+    """
+
+    booking_schema = Schema({
+        'fiscal_quarter_id'                      : 'str',
+        'fiscal_period_id'                       : 'int32',
+        'fiscal_week_id'                         : 'int32',
+        'customer_name'                          : 'str',
+        'partner_name'                           : 'str',
+        'sales_level_1'                          : 'str',
+        'sales_level_2'                          : 'str',
+        'sales_level_3'                          : 'str',
+        'sales_level_4'                          : 'str',
+        'sales_level_5'                          : 'str',
+        'sales_level_6'                          : 'str',
+        'internal_sub_business_entity_name'      : 'str',
+        'services_indicator'                     : 'str',
+        'bookings_adjustments_code'              : 'str',
+        'bookings_adjustments_type'              : 'str',
+        'tbm'                                    : 'str',
+        'booking_net'                            : 'float64',
+        'standard_cost'                          : 'float64',
+        'tms_sales_allocated_bookings_base_list' : 'float64',
+    })
+
+    sfdc_schema = Schema({
+        'fiscal_period'                     : 'str',
+        'fiscal_month'                      : 'int8',
+        'fiscal_week_of_month'              : 'int8',
+        'opportunity_id'                    : 'str',
+        'opportunity_status'                : 'str',
+        'customer_name'                     : 'str',
+        'sales_level_3'                     : 'str',
+        'sales_level_4'                     : 'str',
+        'sales_level_5'                     : 'str',
+        'internal_sub_business_entity_name' : 'str',
+        'technology_service_code'           : 'str',
+        'no_of_days_past_ebd'               : 'float64',
+        'past_due'                          : 'str',
+    })
+
+    schemas = {
+        'ent_dump_from_finance'     : booking_schema,
+        'ent_dump_from_finance_old' : booking_schema,
+        'sfdc_raw_dump'             : sfdc_schema,
+    }
+
+    # dtypes of the fields as stored in the collections read, for the
+    # typed Arrow reads; 'erp_deal_id' holds numbers and strings alike
+    mapped_dtypes = dict.fromkeys([ 'arch1', 'arch2', 'tech_name1', 'tech_name2', 'tech_name3', 'rm_name', 
+        'od_name', 'segment', 'country', 'region', 'state', 'acc_name', 'grp_name' ], 'str')
+    edff_dtypes   = { 
+        **booking_schema.dtypes, 
+        **dict.fromkeys([ 'recurring_offer_flag', 'product_classification', 'grp_ver', 'grp_ver2' ], 'str'),
+    }
+    stored_dtypes = {
+        'ent_dump_from_finance' : edff_dtypes,
+        'sfdc_raw_dump'         : dict(sfdc_schema.dtypes),
+        'booking_dump'          : {
+            **{ col: dtype for col, dtype in edff_dtypes.items() 
+                if col not in ('tbm', 'tms_sales_allocated_bookings_base_list') },
+            **dict.fromkeys([ 'fiscal_year_id', 'fiscal_month_id', 'prod_serv', 'cloud_flag', 'tier_code', 
+                'deal_id_desc', 'sales_agent' ], 'str'),
+            'base_list' : 'float64',
+            **mapped_dtypes,
+        },
+        'sfdc_dump'             : {
+            **sfdc_schema.dtypes,
+            **dict.fromkeys([ 'fiscal_year_id', 'fiscal_quarter', 'fiscal_quarter_id', 'fiscal_month_id', 
+                'prod_serv' ], 'str'),
+            **dict.fromkeys([ 'fiscal_week_id', 'fiscal_period_id' ], 'int64'),
+            **mapped_dtypes,
+        },
+    }
+
+
+    @classmethod
+    def get(cls, collname):
+        """Returns the schema of the collection or None if not registered"""
+        return cls.schemas.get(collname)
+
+    @classmethod
+    def stored(cls, collname):
+        """Returns the dtypes of the fields as stored in the collection,
+        empty if not registered
+        """
+        return cls.stored_dtypes.get(collname, {})
@@ -5,10 +5,18 @@ from __future__ import division, print_function, absolute_import
 import sys
 import os
 from datetime import datetime
-from pymongo import MongoClient
+from pymongo import WriteConcern
+from pymongo.errors import BulkWriteError
 from raptors.views.misc import ProgressBar
+from raptors.helpers.mongoutils import MongoClients
+from raptors.models.indexspecs import IndexRegistry
+from raptors.helpers.exceptions.modelsexceptions import WriteVerificationFailedException
+from raptors.helpers.exceptions.modelsexceptions import PartitionWriteFailedException
 from pprint import pprint
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import timeit
+import time
+import numpy as np
 import pandas as pd
 
 from raptors import __version__
@@ -53,6 +61,48 @@ class Writer():
         self.writer.validate()
         return
 
+    def fingerprints(self, qry, field):
+        """Hook method to return the ids and row fingerprints
+        of the documents matching the query
+        """
+        return self.writer.fingerprints(qry, field)
+
+    def trash_ids(self, ids):
+        """Hook method to remove the documents/rows by their ids
+        """
+        return self.writer.trash_ids(ids)
+
+    def is_staged(self):
+        """Hook method to tell whether writes go through a staging area
+        """
+        return self.writer.staged
+
+    def stage(self):
+        """Hook method to redirect the writes into a staging area
+        """
+        return self.writer.stage()
+
+    def promote(self):
+        """Hook method to swap the staging area in place of the target
+        """
+        return self.writer.promote()
+
+    def ensure_indexes(self, keys_list):
+        """Hook method to create the indexes which do not exist yet
+        """
+        return self.writer.ensure_indexes(keys_list)
+
+    def index_keys(self):
+        """Hook method to return the keys of the existing indexes by name
+        """
+        return self.writer.index_keys()
+
+    def index_usage(self):
+        """Hook method to return the number of operations served
+        by every index by name
+        """
+        return self.writer.index_usage()
+
     def how_many_docs(self, qry):
         """Hook method to return number of documents
         """
@@ -79,37 +129,230 @@ class MongoWriter():
     """Writes Dictionary data into MongoDB
     """
 
+    min_batchsize      = 100
+    max_batchsize      = 50000
+    target_latency     = 0.5 # seconds per batch round trip
+    rebuild_threshold  = 100000 # rows from which indexes are rebuilt after the write
+    settle_timeout     = 60 # seconds unacknowledged writes are given to be applied before verifying
+    settle_interval    = 0.5
+    index_opts_skipped = [ 'key', 'v', 'ns', 'background' ]
+
 
-    def __init__(self, dbname, collname, host='localhost', port=27017):
-        """Initializer for MongoWriter"""
+    def __init__(self, dbname, collname, host='localhost', port=27017, batchsize=1000, fast=False, workers=1, 
+            staged=False, count=True):
+        """Initializer for MongoWriter; with count=False the documents
+        existing before are not counted, as by the partition writers
+        """
         self.dbname, self.collname = dbname, collname
-        self.client                = MongoClient(host, port)
+        self.host, self.port       = host, port
+        self.client                = MongoClients.get(host, port)
         self.db                    = self.client[dbname]
         self.coll                  = self.db[collname]
         self.sensitive_collections = [ 'ent_dump_from_finance', 'ent_dump_from_finance_old' ]
         self.alert                 = collname in self.sensitive_collections
-        self.recs_before           = self.how_many_docs()
+        self.batchsize             = batchsize if batchsize else 1000
+        self.fast                  = fast
+        self.workers               = workers if workers else 1
+        self.staged                = staged
+        self.staging_collname      = "{}_staging".format(collname)
+        self.recs_before           = self.how_many_docs() if count else 0
         self.recs_after            = 0
         self.recs_planned          = 0
 
     def write(self, df):
-        """Public method to write the data into MongoDB"""
+        """Public method to write the data into MongoDB in batches"""
         tot_rows = df.shape[0]
         print('[Info]: Writing Data...')
-        tic  = timeit.default_timer()
-        pbar = ProgressBar(tot_rows, tic)
-        for idx, row in df.iterrows():
-            try:
-                result = self.coll.insert(dict(row))
-            except OverflowError:
-                opp_id = row['opportunity_id']
-                row['opportunity_id'] = str(opp_id) if isinstance(opp_id, int) else opp_id
-                result = self.coll.insert(dict(row))
-            pbar.display(idx)
-        tot_docs = self.how_many_docs()
-        print("Collection now has {} document(s)\n\nAll done!".format(tot_docs))
+        parallel      = self.workers > 1 and tot_rows > self.batchsize
+        recs_expected = self.how_many_docs() + tot_rows if self.fast or parallel else None
+        dropped       = self._drop_indexes() if self._rebuilds_indexes(tot_rows) else {}
+        try:
+            if parallel:
+                self._write_partitions(df)
+            else:
+                self._write_batches(df, ProgressBar(tot_rows, timeit.default_timer()))
+        finally:
+            self._create_indexes(self.coll, dropped)
+        tot_docs = self._settled_count(recs_expected) if self.fast else self.how_many_docs()
+        if recs_expected is not None:
+            self._verify_count(recs_expected, tot_docs)
+        print("\nCollection now has {} document(s)\n\nAll done!".format(tot_docs))
+        return
+
+    def _write_batches(self, df, pbar=None):
+        """Writes the dataframe batch by batch over this writer's connection"""
+        coll      = self._bulk_collection()
+        tot_rows  = df.shape[0]
+        batchsize = self.batchsize
+        start     = 0
+        while start < tot_rows:
+            docs    = df.iloc[start:start+batchsize].to_dict('records')
+            elapsed = self._insert_batch(coll, docs)
+            start  += len(docs)
+            if pbar is not None:
+                pbar.advance(len(docs))
+            batchsize = self._adapt_batchsize(batchsize, len(docs), elapsed)
+        return tot_rows
+
+    def _write_partitions(self, df):
+        """Splits the dataframe into one partition per worker and writes
+        them concurrently, each worker process over its own connection
+        """
+        bounds   = np.linspace(0, df.shape[0], self.workers + 1).astype(int)
+        failures = []
+        print("[Info]: Writing {} partition(s) with {} writer(s)...".format(len(bounds) - 1, self.workers))
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            futures = {}
+            for part, (lo, hi) in enumerate(zip(bounds[:-1], bounds[1:])):
+                future = pool.submit(write_partition, df.iloc[lo:hi], self.dbname, self.coll.name, 
+                        self.host, self.port, self.batchsize, self.fast, MongoClients.options)
+                futures[future] = part
+            for future in as_completed(futures):
+                part = futures[future]
+                try:
+                    rows = future.result()
+                    print("[Info]: Partition {} wrote {} row(s)".format(part, rows))
+                except Exception as e:
+                    failures.append(part)
+                    print("[Error]: Partition {} failed due to \n\n{}".format(part, e))
+        if failures:
+            raise PartitionWriteFailedException(sorted(failures))
+        return
+
+    def _bulk_collection(self):
+        """Returns the collection handle to be used for bulk inserts;
+        fast mode skips the acknowledgement of every batch
+        """
+        if self.fast:
+            return self.coll.with_options(write_concern=WriteConcern(w=0))
+        return self.coll
+
+    def _insert_batch(self, coll, docs):
+        """Inserts one batch and returns the elapsed time of the round trip"""
+        tic = timeit.default_timer()
+        try:
+            coll.insert_many(docs, ordered=False)
+        except OverflowError:
+            self._retry_batch(coll, docs)
+        return timeit.default_timer() - tic
+
+    def _retry_batch(self, coll, docs):
+        """Retries a batch which failed with integers too big for BSON
+        by stringifying those 'opportunity_id's; documents of the batch
+        already sent carry their '_id', so their duplicate key errors are ignored
+        """
+        for doc in docs:
+            opp_id = doc.get('opportunity_id')
+            if isinstance(opp_id, int) and not -2**63 <= opp_id < 2**63:
+                doc['opportunity_id'] = str(opp_id)
+        try:
+            coll.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            errors = e.details.get('writeErrors', [])
+            if e.details.get('writeConcernErrors') or any(err['code'] != 11000 for err in errors):
+                raise
+        return
+
+    def _adapt_batchsize(self, batchsize, sent, elapsed):
+        """Grows the batch size while round trips are cheap and
+        shrinks it when they get slower than the target latency
+        """
+        if elapsed > self.target_latency:
+            return max(self.min_batchsize, batchsize // 2)
+        if sent == batchsize and elapsed < self.target_latency / 2:
+            return min(self.max_batchsize, batchsize * 2)
+        return batchsize
+
+    def _settled_count(self, expected):
+        """Counts the documents until the unacknowledged writes have all
+        been applied by the server or the settle timeout elapses
+        """
+        deadline = timeit.default_timer() + self.settle_timeout
+        found    = self.how_many_docs()
+        while found < expected and timeit.default_timer() < deadline:
+            time.sleep(self.settle_interval)
+            found = self.how_many_docs()
+        return found
+
+    def _verify_count(self, expected, found):
+        """Verifies the number of documents after an unacknowledged write"""
+        if expected != found:
+            raise WriteVerificationFailedException(expected, found)
+        return
+
+    def stage(self):
+        """Redirects the writes into an empty staging collection"""
+        print("[Info]: Loading into staging collection '{}'...".format(self.staging_collname))
+        self.db.drop_collection(self.staging_collname)
+        self.coll = self.db.create_collection(self.staging_collname) # Renamed by promote even if nothing is written
+        return
+
+    def promote(self):
+        """Rebuilds the target's and the declared indexes on the staging
+        collection and atomically renames it over the target collection
+        """
+        live = self.db[self.collname]
+        self._create_indexes(self.coll, { name: info for name, info in live.index_information().items() 
+            if name != '_id_' })
+        self.ensure_indexes(IndexRegistry.get(self.collname))
+        self.coll.rename(self.collname, dropTarget=True)
+        self.coll = live
+        print("[Info]: '{}' swapped in place of '{}'".format(self.staging_collname, self.collname))
+        return
+
+    def _rebuilds_indexes(self, tot_rows):
+        """Tells whether the indexes are to be dropped during the write
+        and rebuilt afterwards: only for big writes into the staging
+        collection or an emptied one, which no reader relies on yet
+        """
+        if tot_rows < self.rebuild_threshold:
+            return False
+        return self.coll.name == self.staging_collname or self.how_many_docs() == 0
+
+    def _drop_indexes(self):
+        """Drops the secondary indexes, except the unique ones, ahead of
+        a bulk write and returns them to be rebuilt afterwards
+        """
+        dropped = {}
+        for name, info in self.coll.index_information().items():
+            if name == '_id_' or info.get('unique'):
+                continue
+            self.coll.drop_index(name)
+            dropped[name] = info
+        if dropped:
+            print("[Info]: {} index(es) dropped to be rebuilt after the write".format(len(dropped)))
+        return dropped
+
+    def _create_indexes(self, coll, infos):
+        """Creates the indexes described by 'index_information' on the collection"""
+        for name, info in infos.items():
+            opts = { key: val for key, val in info.items() if key not in self.index_opts_skipped }
+            print("[Info]: Building index '{}'...".format(name))
+            coll.create_index(info['key'], name=name, background=True, **opts)
         return
 
+    def ensure_indexes(self, keys_list):
+        """Creates in the background the indexes which do not exist
+        yet and returns the names of the ones created
+        """
+        existing = list(self.index_keys().values())
+        created  = []
+        for keys in keys_list:
+            if [ tuple(key) for key in keys ] not in existing:
+                created.append(self.coll.create_index(keys, background=True))
+        return created
+
+    def index_keys(self):
+        """Returns the keys of the existing indexes by name"""
+        return { name: [ (field, direction) for field, direction in info['key'] ] 
+                for name, info in self.coll.index_information().items() }
+
+    def index_usage(self):
+        """Returns the number of operations served by every index
+        by name since the server started, as reported by '$indexStats'
+        """
+        return { stat['name']: stat['accesses']['ops'] for stat in self.coll.aggregate([ { '$indexStats': {} } ]) }
+
     def validate(self):
         pass
         
@@ -117,6 +360,16 @@ class MongoWriter():
         """Returns the number of documents existing in the collection"""
         return self.coll.find(qry).count()
 
+    def fingerprints(self, qry, field):
+        """Returns '_id' and the fingerprint field of the matching documents as Pandas dataframe"""
+        return pd.DataFrame(list(self.coll.find(qry, { '_id': 1, field: 1 })), columns=[ '_id', field ])
+
+    def trash_ids(self, ids, batchsize=10000):
+        """Removes the documents by '_id' in bulk batches"""
+        for start in range(0, len(ids), batchsize):
+            self.coll.delete_many({ '_id': { '$in': ids[start:start+batchsize] } })
+        return
+
     def trash_one(self, qry):
         """Removes just one document from the collection"""
         self.recs_planned = self.how_many_docs(qry)
@@ -130,6 +383,15 @@ class MongoWriter():
         self.recs_after  = self.how_many_docs()
         
 
+def write_partition(df, dbname, collname, host, port, batchsize, fast, client_opts):
+    """Writes one partition of a dataframe from a worker process of
+    MongoWriter's parallel mode and returns the number of rows sent
+    """
+    MongoClients.configure(**client_opts)
+    writer = MongoWriter(dbname, collname, host=host, port=port, batchsize=batchsize, fast=fast, count=False)
+    return writer._write_batches(df)
+
+
 class ExcelWriter():
     """Writes Dictionary data into Excel
     """
@@ -11,8 +11,16 @@ from raptors.controllers.sync import Sync
 from raptors.controllers.generate import Generate
 from raptors.controllers.prepare import Prepare
 from raptors.controllers.cleandump import CleanBookingDump, CleanSFDCDump
+from raptors.controllers.indexes import Indexes
+from raptors.helpers.cacheutils import FrameCache
+from raptors.helpers.mongoutils import MongoClients
 from raptors.helpers.exceptions.controllersexceptions import SyncFilePathNotGivenException
 from raptors.helpers.exceptions.controllersexceptions import BothCommAndAllSL3TrueError
+from raptors.helpers.exceptions.controllersexceptions import SyncOptionsConflictException
+from raptors.helpers.exceptions.controllersexceptions import ConfiguredFieldsMissingException
+from raptors.helpers.exceptions.modelsexceptions import WriteVerificationFailedException
+from raptors.helpers.exceptions.modelsexceptions import FileDoesNotExistException
+from raptors.helpers.exceptions.modelsexceptions import PartitionWriteFailedException
 
 from raptors import __version__
 
@@ -29,16 +37,23 @@ class Config(object):
     def __init__(self):
         self.homedir = '~/Documents/Jeyaraj/My_Contents/Work/Commercial/Templates/XLSX'
         self.reptdir = '~/Documents/Jeyaraj/My_Contents/Work/Commercial/Reports'
+        self.cachedir = '~/.raptors/cache'
 
 
 pass_config = click.make_pass_decorator(Config, ensure=True)
 
 
 @click.group()
+@click.option('--pool-size', type=int, help='Maximum connections per MongoDB client')
+@click.option('--compressors', help='MongoDB wire compressors, e.g. zstd,snappy,zlib')
+@click.option('--timeout', type=int, help='MongoDB server selection and connect timeout in ms')
+@click.option('--socket-timeout', type=int, help='MongoDB socket timeout in ms')
 @pass_config
-def main(config):
+def main(config, pool_size, compressors, timeout, socket_timeout):
     """Data 'raptors' welcomes you!
     """
+    MongoClients.configure(maxPoolSize=pool_size, compressors=compressors, serverSelectionTimeoutMS=timeout, 
+            connectTimeoutMS=timeout, socketTimeoutMS=socket_timeout)
     full_decor = "="*80
     half_decor = "="*35
     click.echo("")
@@ -66,26 +81,49 @@ def clonedata(config, alldata, outfile, database, collection):
     return
 
 @main.command()
-@click.option('--filepath',   '-f', help='Absolute file path to read the data')
-@click.option('--sheetname',  '-s', help='Excel file sheetname of the data')
+@click.option('--filepath',   '-f', help='Absolute file path, directory or glob pattern to read the data')
+@click.option('--sheetname',  '-s', multiple=True, help='Excel file sheetname(s) of the data')
 @click.option('--collection', '-c', help='MongoDB switch to give collection name')
 @click.option('--database',   '-d', help='MongoDB switch to give database name')
 @click.option('--host',       '-h', help='MongoDB Host')
 @click.option('--port',       '-p', help='MongoDB Port')
+@click.option('--streaming/--no-streaming', default=False, help='Read and write the sheet chunk by chunk')
+@click.option('--chunksize', type=int, default=50000, help='Number of rows per chunk while streaming')
+@click.option('--incremental/--no-incremental', default=False, help='Write only the rows changed since the last load')
+@click.option('--cache/--no-cache', default=True, help='Reuse the parsed workbook while the file is unchanged')
+@click.option('--cachesize', type=int, default=2048, help='Size limit of the workbook cache in MB')
+@click.option('--readers', type=int, help='Number of processes parsing several files/sheets')
+@click.option('--batchsize', type=int, default=1000, help='Initial number of documents per bulk insert')
+@click.option('--fast/--no-fast', default=False, help='Unacknowledged writes verified by a final count')
+@click.option('--writers', type=int, default=1, help='Number of parallel writer processes')
 @click.argument('filename')
 @pass_config
-def takefood(config, filepath, sheetname, collection, database, host, port, filename):
-    """Data Uploader into Database from Excel"""
+def takefood(config, filepath, sheetname, collection, database, host, port, streaming, chunksize, 
+        incremental, cache, cachesize, readers, batchsize, fast, writers, filename):
+    """Data Uploader into Database from Excel, CSV or Parquet"""
     if filepath is None and filename is None:
         raise SyncFilePathNotGivenException("")
     org_db = filepath
     if not org_db:
         org_db  = os.path.join(os.path.expanduser(config.homedir), "{}.xlsx".format(filename))
-    org_db = org_db if org_db.lower().endswith('.xlsx') else "{}.xlsx".format(org_db)
-    org_tbl = sheetname if sheetname else None
+    try:
+        org_db = Sync.expand_sources(org_db)
+    except FileDoesNotExistException as e:
+        print("[Error]: Couldn't proceed further due to \n\n{}".format(e.msg()))
+        return
+    if len(org_db) == 1 and os.path.splitext(org_db[0])[1].lower() not in Sync.readable_extensions:
+        org_db = [ "{}.xlsx".format(org_db[0]) ]
+    org_tbl = list(sheetname) if sheetname else None
     des_db  = database if database else 'ccsdm'
     des_tbl = collection if collection else filename
-    Sync(org_db, org_tbl, des_db, des_tbl, host=host, port=port).execute()
+    write_opts = { 'batchsize': batchsize, 'fast': fast, 'workers': writers }
+    cache = FrameCache(os.path.join(config.cachedir, 'workbooks'), max_bytes=cachesize*1024**2) if cache else None
+    try:
+        Sync(org_db, org_tbl, des_db, des_tbl, host=host, port=port, 
+                streaming=streaming, chunksize=chunksize, incremental=incremental, cache=cache, readers=readers, 
+                write_opts=write_opts).execute()
+    except (WriteVerificationFailedException, PartitionWriteFailedException, SyncOptionsConflictException) as e:
+        print("[Error]: Couldn't proceed further due to \n\n{}".format(e.msg()))
     return
 
 @main.command()
@@ -95,13 +133,38 @@ def takefood(config, filepath, sheetname, collection, database, host, port, file
 @click.option('--database',   '-d', help='MongoDB switch to give database name')
 @click.option('--host',       '-h', help='MongoDB Host')
 @click.option('--port',       '-p', help='MongoDB Port')
+@click.option('--batchsize', type=int, default=1000, help='Initial number of documents per bulk insert')
+@click.option('--fast/--no-fast', default=False, help='Unacknowledged writes verified by a final count')
+@click.option('--writers', type=int, default=1, help='Number of parallel writer processes')
+@click.option('--staged/--no-staged', default=False, help='Load into a staging collection and swap it in')
+@click.option('--readers', type=int, default=1, help='Number of concurrent month reads, one $in query if 1')
+@click.option('--mapper-cache/--no-mapper-cache', default=True, help='Reuse prepared mappers while unchanged')
+@click.option('--server-side/--no-server-side', default=False, help='Derive the columns in MongoDB while reading')
+@click.option('--mapping-engine', type=click.Choice([ 'merge', 'lookup', 'hash' ]), default='merge', 
+        help='Map in Pandas by merges or hash indexers, or in MongoDB by $lookup')
+@click.option('--pushdown/--no-pushdown', default=False, help='Read only the fields the cleanup and reports need')
+@click.option('--field-config', multiple=True, help="Field configuration of the reports, e.g. 'a:field' read by --pushdown")
+@click.option('--arrow/--no-arrow', default=False, help='Decode the MongoDB reads into Arrow columns (pymongoarrow)')
+@click.option('--partitions', type=int, default=1, help='Number of ranges of the dump read concurrently')
+@click.option('--partition-field', type=click.Choice([ '_id', 'fiscal_period_id' ]), default='_id', 
+        help='Field whose sampled values split the dump into ranges')
 @click.argument('years', nargs=-1, required=False)
 @pass_config
-def makepacks(config, history, comm, collection, database, host, port, years):
+def makepacks(config, history, comm, collection, database, host, port, batchsize, fast, writers, staged, 
+        readers, mapper_cache, server_side, mapping_engine, pushdown, field_config, arrow, partitions, partition_field, 
+        years):
     """Validates and creates 'booking_dump' collection"""
     des_db  = database if database else 'ccsdm'
     des_tbl = collection if collection else 'booking_dump'
-    CleanBookingDump(history, years, comm, des_tbl, des_db, host=host, port=port).execute()
+    read_opts  = { 'arrow': arrow, 'partitions': partitions, 'partition_field': partition_field }
+    write_opts = { 'batchsize': batchsize, 'fast': fast, 'workers': writers, 'staged': staged }
+    mapper_cache = FrameCache(os.path.join(config.cachedir, 'mappers')) if mapper_cache else None
+    try:
+        CleanBookingDump(history, years, comm, des_tbl, des_db, host=host, port=port, readers=readers, 
+                mapper_cache=mapper_cache, server_side=server_side, mapping_engine=mapping_engine, 
+                pushdown=pushdown, read_opts=read_opts, write_opts=write_opts, field_config=field_config).execute()
+    except (WriteVerificationFailedException, PartitionWriteFailedException) as e:
+        print("[Error]: Couldn't proceed further due to \n\n{}".format(e.msg()))
     return
     
 @main.command()
@@ -110,12 +173,33 @@ def makepacks(config, history, comm, collection, database, host, port, years):
 @click.option('--database',   '-d', help='MongoDB switch to give database name')
 @click.option('--host',       '-h', help='MongoDB Host')
 @click.option('--port',       '-p', help='MongoDB Port')
+@click.option('--batchsize', type=int, default=1000, help='Initial number of documents per bulk insert')
+@click.option('--fast/--no-fast', default=False, help='Unacknowledged writes verified by a final count')
+@click.option('--writers', type=int, default=1, help='Number of parallel writer processes')
+@click.option('--staged/--no-staged', default=False, help='Load into a staging collection and swap it in')
+@click.option('--mapper-cache/--no-mapper-cache', default=True, help='Reuse prepared mappers while unchanged')
+@click.option('--server-side/--no-server-side', default=False, help='Derive the columns in MongoDB while reading')
+@click.option('--mapping-engine', type=click.Choice([ 'merge', 'lookup', 'hash' ]), default='merge', 
+        help='Map in Pandas by merges or hash indexers, or in MongoDB by $lookup')
+@click.option('--arrow/--no-arrow', default=False, help='Decode the MongoDB reads into Arrow columns (pymongoarrow)')
+@click.option('--partitions', type=int, default=1, help='Number of ranges of the dump read concurrently')
+@click.option('--partition-field', type=click.Choice([ '_id', 'fiscal_period_id' ]), default='_id', 
+        help='Field whose sampled values split the dump into ranges')
 @pass_config
-def migratefuture(config, comm, collection, database, host, port):
+def migratefuture(config, comm, collection, database, host, port, batchsize, fast, writers, staged, mapper_cache,
+        server_side, mapping_engine, arrow, partitions, partition_field):
     """Validates and creates 'sfdc_dump' collection"""
     des_db  = database if database else 'ccsdm'
     des_tbl = collection if collection else 'sfdc_dump'
-    CleanSFDCDump(comm, des_tbl, des_db, host=host, port=port).execute()
+    read_opts  = { 'arrow': arrow, 'partitions': partitions, 'partition_field': partition_field }
+    write_opts = { 'batchsize': batchsize, 'fast': fast, 'workers': writers, 'staged': staged }
+    mapper_cache = FrameCache(os.path.join(config.cachedir, 'mappers')) if mapper_cache else None
+    try:
+        CleanSFDCDump(comm, des_tbl, des_db, host=host, port=port, mapper_cache=mapper_cache, 
+                server_side=server_side, mapping_engine=mapping_engine, read_opts=read_opts, 
+                write_opts=write_opts).execute()
+    except (WriteVerificationFailedException, PartitionWriteFailedException) as e:
+        print("[Error]: Couldn't proceed further due to \n\n{}".format(e.msg()))
     return
     
 @main.command()
@@ -127,9 +211,18 @@ def migratefuture(config, comm, collection, database, host, port):
 @click.option('--history',   '-y', type=int, help='History -- no/. years')
 @click.option('--cur_year',  '-c', help='Current Year')
 @click.option('--sheetname', '-s', help='Excel SheetName')
+@click.option('--batchsize', type=int, default=1000, help='Initial number of documents per bulk insert')
+@click.option('--fast/--no-fast', default=False, help='Unacknowledged writes verified by a final count')
+@click.option('--writers', type=int, default=1, help='Number of parallel writer processes')
+@click.option('--staged/--no-staged', default=False, help='Load into a staging collection and swap it in')
+@click.option('--readers', type=int, default=4, help='Number of aggregation pipelines run concurrently')
+@click.option('--read-preference', type=click.Choice(list(MongoClients.preferences)), 
+        help='Where the report reads are served, e.g. secondaryPreferred')
+@click.option('--arrow/--no-arrow', default=False, help='Decode the MongoDB reads into Arrow columns (pymongoarrow)')
 @click.argument('field_config', nargs=-1, required=False)
 @pass_config
-def generate(config, name, owner, dbname, host, port, history, cur_year, sheetname, field_config):
+def generate(config, name, owner, dbname, host, port, history, cur_year, sheetname, batchsize, fast, writers, 
+        staged, readers, read_preference, arrow, field_config):
     """Generates Excel reports based on name and owner"""
     rept_opts = { 
         'name': name, 
@@ -139,8 +232,26 @@ def generate(config, name, owner, dbname, host, port, history, cur_year, sheetna
         'field_config': field_config
     }
     xl_opts = { 'filepath': config.reptdir, 'sheetname': sheetname }
-    mong_opts = { 'host': host, 'port': port, 'dbname': dbname }
-    Generate(rept_opts, mong_opts, xl_opts).execute()
+    mong_opts = { 'host': host, 'port': port, 'dbname': dbname, 'readers': readers, 
+            'read_preference': read_preference, 'arrow': arrow }
+    write_opts = { 'batchsize': batchsize, 'fast': fast, 'workers': writers, 'staged': staged }
+    try:
+        Generate(rept_opts, mong_opts, xl_opts, write_opts).execute()
+    except (WriteVerificationFailedException, PartitionWriteFailedException, ConfiguredFieldsMissingException) as e:
+        print("[Error]: Couldn't proceed further due to \n\n{}".format(e.msg()))
+    return
+    
+    
+@main.command()
+@click.option('--collection', '-c', multiple=True, help='Collection(s) to be indexed, all declared ones by default')
+@click.option('--database',   '-d', help='MongoDB switch to give database name')
+@click.option('--host',       '-h', help='MongoDB Host')
+@click.option('--port',       '-p', help='MongoDB Port')
+@click.option('--create/--report-only', default=True, help='Create the missing indexes or just report')
+@pass_config
+def indexes(config, collection, database, host, port, create):
+    """Creates and verifies the indexes of the collections"""
+    Indexes(collections=list(collection), dbname=database, host=host, port=port, create=create).execute()
     return
     
     
@@ -27,19 +27,29 @@ class ProgressBar():
         self.tot_rows = tot_rows
         self.tic      = tic
         self.freq     = freq
+        self.done     = 0
 
     def display(self, idx):
         """Prints Progress"""
         if (ProgressBar.idx+1) % 10 == 0:
-            toc = timeit.default_timer()
-            elapsed = toc - self.tic
-            el_in_hr = int(float(elapsed)/float(60*60))
-            el_in_min = int(float(elapsed)/float(60))
-            el_in_sec = elapsed % (60*60)
-            completed = (float(ProgressBar.idx+1)/float(self.tot_rows))*100
-            sys.stdout.write( "Processed %.2f%% - (%d)/(%d) row(s) %d hr(s) %d min(s) %d sec(s)...\r" \
-                    % (completed, ProgressBar.idx+1, self.tot_rows, el_in_hr, el_in_min, el_in_sec))
-            sys.stdout.flush()
+            self._print_progress(ProgressBar.idx+1)
         ProgressBar.idx += 1
         return
-        
+
+    def advance(self, rows):
+        """Prints Progress after a batch of rows"""
+        self.done += rows
+        self._print_progress(self.done)
+        return
+
+    def _print_progress(self, done):
+        """Prints the rows done out of the total with the elapsed time"""
+        elapsed = timeit.default_timer() - self.tic
+        el_in_hr = int(float(elapsed)/float(60*60))
+        el_in_min = int(float(elapsed)/float(60))
+        el_in_sec = elapsed % (60*60)
+        completed = (float(done)/float(self.tot_rows))*100
+        sys.stdout.write( "Processed %.2f%% - (%d)/(%d) row(s) %d hr(s) %d min(s) %d sec(s)...\r" \
+                % (completed, done, self.tot_rows, el_in_hr, el_in_min, el_in_sec))
+        sys.stdout.flush()
+        return
@@ -0,0 +1,87 @@
+import os
+import shutil
+import tempfile
+import unittest
+import pandas as pd
+from raptors.helpers.cacheutils import FrameCache
+
+__author__ = "Jeyaraj Durairaj"
+__copyright__ = "Jeyaraj Durairaj"
+__license__ = "none"
+
+
+class FrameCacheTest(unittest.TestCase):
+    """Unit test to run test cases on FrameCache class
+    """
+
+
+    def setUp(self):
+        """Initialization of FrameCacheTest
+        """
+        self.cachedir = tempfile.mkdtemp()
+        self.cache    = FrameCache(self.cachedir)
+        self.df       = pd.DataFrame({ 'customer_name': [ 'A', 'B' ], 'booking_net': [ 1.5, 2.0 ] })
+
+    def tearDown(self):
+        """Removes the temporary cache directory
+        """
+        shutil.rmtree(self.cachedir)
+
+    def test_missing_key_returns_none(self):
+        """Tests whether an unknown key is a cache miss"""
+        self.assertIsNone(self.cache.load(FrameCache.make_key('missing')))
+        return
+
+    def test_stored_frame_is_loaded_back(self):
+        """Tests whether a stored dataframe round trips"""
+        key = FrameCache.make_key('file.xlsx', 10, 20, 'Sheet1')
+        self.cache.store(key, self.df)
+        pd.testing.assert_frame_equal(self.cache.load(key), self.df)
+        return
+
+    def test_key_changes_with_parts(self):
+        """Tests whether a changed mtime makes a different key"""
+        self.assertNotEqual(FrameCache.make_key('file.xlsx', 10, 20), FrameCache.make_key('file.xlsx', 10, 21))
+        return
+
+    def test_eviction_keeps_cache_within_limit(self):
+        """Tests whether the oldest entries are evicted beyond the size limit"""
+        cache = FrameCache(self.cachedir, max_bytes=0)
+        cache.store(FrameCache.make_key('old'), self.df)
+        self.assertEqual(len(os.listdir(self.cachedir)), 0)
+        return
+
+    def test_failed_store_leaves_no_temporary_file(self):
+        """Tests whether the temporary file of a failed write is removed"""
+        key = FrameCache.make_key('broken')
+        def write(tmp):
+            open(tmp, 'w').close()
+            raise OSError("disk full")
+        with self.assertRaises(OSError):
+            self.cache._write(key, '.parquet', write)
+        self.assertEqual(os.listdir(self.cachedir), [])
+        return
+
+    def test_stale_temporary_files_are_evicted(self):
+        """Tests whether temporary files left over are removed, recent ones kept"""
+        stale  = os.path.join(self.cachedir, 'stale.parquet.tmp')
+        recent = os.path.join(self.cachedir, 'recent.parquet.tmp')
+        for path in [ stale, recent ]:
+            open(path, 'w').close()
+        os.utime(stale, (0, 0))
+        self.cache.store(FrameCache.make_key('new'), self.df)
+        self.assertFalse(os.path.exists(stale))
+        self.assertTrue(os.path.exists(recent))
+        return
+
+    def test_entry_evicted_while_loaded_is_a_miss(self):
+        """Tests whether an entry removed by another process during the load is a cache miss"""
+        key = FrameCache.make_key('evicted')
+        self.cache.store(key, self.df)
+        def evicted(path):
+            os.remove(path)
+            return pd.read_parquet(path)
+        self.cache.formats = [ ('.parquet', evicted) ]
+        self.assertIsNone(self.cache.load(key))
+        return
+
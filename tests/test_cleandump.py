@@ -0,0 +1,95 @@
+import time
+import unittest
+from raptors.controllers.cleandump import CleanDump
+
+__author__ = "Jeyaraj Durairaj"
+__copyright__ = "Jeyaraj Durairaj"
+__license__ = "none"
+
+
+class Mapping():
+    """Stand-in mapping engine giving the preparation tasks
+    """
+
+
+    def __init__(self, tasks, prepared_before_read=False):
+        """Initializer of Mapping"""
+        self.tasks                = tasks
+        self.prepared_before_read = prepared_before_read
+
+    def prepare_tasks(self):
+        """Returns the preparation tasks"""
+        return self.tasks
+
+
+class Cleaner(CleanDump):
+    """Stand-in cleaner recording what has been run
+    """
+
+
+    def __init__(self, tasks, read_fails=False):
+        """Initializer of Cleaner"""
+        self.mapping    = Mapping(tasks)
+        self.read_fails = read_fails
+        self.cleaned    = False
+
+    def _read_dump(self):
+        """Reads nothing or fails"""
+        if self.read_fails:
+            raise ValueError('read failed')
+        return
+
+    def _cleanup_data(self):
+        """Records the cleanup"""
+        self.cleaned = True
+        return
+
+
+class CleanDumpTest(unittest.TestCase):
+    """Unit test to run test cases on CleanDump class
+    """
+
+
+    def setUp(self):
+        """Initialization of CleanDumpTest
+        """
+        self.prepared = []
+
+    def _prepare(self, name, fails=False):
+        """Returns a slow preparation task recording its name"""
+        def task():
+            time.sleep(0.1)
+            if fails:
+                raise KeyError(name)
+            self.prepared.append(name)
+            return
+        return task
+
+    def test_reads_while_preparing(self):
+        """Tests whether the dump is read and cleaned while the mappings are prepared"""
+        cleaner = Cleaner([ self._prepare('tech'), self._prepare('seg') ])
+        cleaner._read_all()
+        self.assertTrue(cleaner.cleaned)
+        self.assertEqual(sorted(self.prepared), [ 'seg', 'tech' ])
+        return
+
+    def test_failed_read_awaits_preparations(self):
+        """Tests whether a failed read raises only once the preparations are done"""
+        cleaner = Cleaner([ self._prepare('tech') ], read_fails=True)
+        with self.assertRaises(ValueError):
+            cleaner._read_all()
+        self.assertFalse(cleaner.cleaned)
+        self.assertEqual(self.prepared, [ 'tech' ])
+        return
+
+    def test_failed_preparation_raises(self):
+        """Tests whether a failed preparation is raised after the dump is cleaned"""
+        cleaner = Cleaner([ self._prepare('tech', fails=True), self._prepare('seg') ])
+        with self.assertRaises(KeyError):
+            cleaner._read_all()
+        self.assertTrue(cleaner.cleaned)
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+import numpy as np
+import pandas as pd
+from raptors.helpers.fiscalcalendar import FiscalCalendar
+from raptors.models.readers import SFDCRawDumpReader
+
+__author__ = "Jeyaraj Durairaj"
+__copyright__ = "Jeyaraj Durairaj"
+__license__ = "none"
+
+
+class FiscalCalendarTest(unittest.TestCase):
+    """Unit test to run test cases on FiscalCalendar class
+    """
+
+
+    def setUp(self):
+        """Initialization of FiscalCalendarTest
+        """
+        self.df = pd.DataFrame({
+            'fiscal_period'        : [ 'Q1-2018', 'Q1-2018', 'Q3-2019', 'Q1-2018' ],
+            'fiscal_month'         : [ 1, 1, 7, 2 ],
+            'fiscal_week_of_month' : [ 2, 2, 4, 1 ],
+        })
+
+    def test_dimension_holds_distinct_keys(self):
+        """Tests whether the rows are coded into the table of distinct keys"""
+        codes, table = FiscalCalendar([ 'fiscal_period', 'fiscal_month' ]).dimension(self.df)
+        self.assertEqual(codes.tolist(), [ 0, 0, 1, 2 ])
+        self.assertEqual(table['fiscal_month'].tolist(), [ 1, 7, 2 ])
+        return
+
+    def test_missing_keys_are_a_key_of_their_own(self):
+        """Tests whether missing keys are kept apart from the others"""
+        df = pd.DataFrame({ 'fiscal_period_id': [ 201801, np.nan, 201801 ] })
+        codes, table = FiscalCalendar([ 'fiscal_period_id' ]).dimension(df)
+        self.assertEqual(codes.tolist(), [ 0, 1, 0 ])
+        self.assertTrue(pd.isnull(table.loc[1, 'fiscal_period_id']))
+        return
+
+    def test_sfdc_fiscal_columns_are_derived_per_key(self):
+        """Tests whether every fiscal column is derived with its type"""
+        reader    = SFDCRawDumpReader(None)
+        reader.df = self.df.copy()
+        reader.make_fiscal_columns()
+        self.assertEqual(reader.df['fiscal_year_id'].tolist(), [ '2018', '2018', '2019', '2018' ])
+        self.assertEqual(reader.df['fiscal_quarter'].tolist(), [ 'Q1', 'Q1', 'Q3', 'Q1' ])
+        self.assertEqual(reader.df['fiscal_quarter_id'].tolist(), [ '2018Q1', '2018Q1', '2019Q3', '2018Q1' ])
+        self.assertEqual(reader.df['fiscal_month_id'].tolist(), [ '01', '01', '07', '02' ])
+        self.assertEqual(reader.df['fiscal_week_id'].tolist(), [ 2018012, 2018012, 2019074, 2018021 ])
+        self.assertEqual(reader.df['fiscal_period_id'].tolist(), [ 201801, 201801, 201907, 201802 ])
+        self.assertEqual(reader.df['fiscal_week_id'].dtype, np.dtype('int64'))
+        return
@@ -0,0 +1,36 @@
+import unittest
+from raptors.controllers.indexes import Indexes
+from raptors.models.indexspecs import IndexRegistry
+
+__author__ = "Jeyaraj Durairaj"
+__copyright__ = "Jeyaraj Durairaj"
+__license__ = "none"
+
+
+class IndexesTest(unittest.TestCase):
+    """Unit test to run test cases on Indexes class
+    """
+
+
+    def setUp(self):
+        """Initialization of IndexesTest
+        """
+        self.index_keys = {
+            '_id_'                                : [ ('_id', 1) ],
+            'sales_level_3_1'                     : [ ('sales_level_3', 1) ],
+            'sales_level_3_1_fiscal_period_id_1'  : [ ('sales_level_3', 1), ('fiscal_period_id', 1) ],
+            'fiscal_period_id_1'                  : [ ('fiscal_period_id', 1) ],
+            'sales_level_3_-1'                    : [ ('sales_level_3', -1) ],
+        }
+
+    def test_prefix_index_is_redundant(self):
+        """Tests whether an index which is a prefix of another one is reported"""
+        self.assertEqual(Indexes.find_redundant(self.index_keys), 
+                [ ('sales_level_3_1', 'sales_level_3_1_fiscal_period_id_1') ])
+        return
+
+    def test_all_declared_collections_by_default(self):
+        """Tests whether all the declared collections are indexed by default"""
+        self.assertEqual(Indexes().collections, IndexRegistry.collections())
+        self.assertEqual(IndexRegistry.get('master_unique_names'), [])
+        return
@@ -0,0 +1,140 @@
+import unittest
+import numpy as np
+import pandas as pd
+from raptors.models.mappingengines import HashMappingEngine, LookupMappingEngine
+from raptors.helpers.exceptions.modelsexceptions import MappingRowsExceededException
+
+__author__ = "Jeyaraj Durairaj"
+__copyright__ = "Jeyaraj Durairaj"
+__license__ = "none"
+
+
+class Mapped():
+    """Dataframe holder standing in for the readers in the tests
+    """
+
+
+    def __init__(self, df, mappable_cols=None, reader=None):
+        """Initializer for Mapped class"""
+        self.df            = df
+        self.mappable_cols = mappable_cols
+        self.reader        = reader
+        self.rows          = df.shape[0]
+        self.cols          = df.shape[1]
+
+    def delete_columns(self, cols):
+        """Drops columns from the dataframe"""
+        self.df.drop(cols, axis=1, inplace=True)
+        return
+
+
+class Prepared():
+    """Prepared mapper collection standing in for MongoReader in the tests
+    """
+
+
+    def __init__(self, collname, fields):
+        """Initializer for Prepared class"""
+        self.collname = collname
+        self.fields   = fields
+
+    def field_names(self, collname=None):
+        """Returns the field names of the prepared collection"""
+        return self.fields
+
+
+class HashMappingEngineTest(unittest.TestCase):
+    """Unit test to run test cases on HashMappingEngine class
+    """
+
+
+    def setUp(self):
+        """Initialization of HashMappingEngineTest
+        """
+        self.dump = pd.DataFrame({
+            'internal_sub_business_entity_name' : [ 'ISBE1', 'ISBE2', 'ISBE9', 'ISBE1' ],
+            'sales_level_5'                     : [ 'SL1', 'SL2', 'SL1', np.nan ],
+            'customer_name'                     : [ 'CUST1', 'CUST2', 'CUST3', 'CUST1' ],
+            'arch2'                             : [ 'X', 'X', 'X', 'X' ],
+        })
+        self.techmapper = Mapped(pd.DataFrame({
+            'internal_sub_business_entity_name' : [ 'ISBE1', 'ISBE2' ],
+            'arch2'                             : [ 'SEC', 'COLLAB' ],
+            'tech_id'                           : [ 1, 2 ],
+        }), 'internal_sub_business_entity_name')
+        self.segmapper = Mapped(pd.DataFrame({
+            'sales_level_5' : [ 'SL1', 'SL2', 'SL3', 'SL3' ],
+            'segment'       : [ 'SEG1', 'SEG2', 'SEG3', 'SEG3' ],
+        }), 'sales_level_5')
+        self.uniquenames = Mapped(pd.DataFrame({
+            'customer_name' : [ 'CUST1', 'CUST2' ],
+            'unique_name'   : [ 'UNIQ1', 'UNIQ2' ],
+        }), 'customer_name')
+
+    def test_maps_as_the_merges_do(self):
+        """Tests whether the hash mapping equals the left merges"""
+        expected = self.dump
+        for mapper in [ self.techmapper, self.segmapper, self.uniquenames ]:
+            expected = pd.merge(expected, mapper.df, how='left', on=mapper.mappable_cols)
+        reader = Mapped(self.dump.copy())
+        HashMappingEngine(self.techmapper, self.segmapper, self.uniquenames).map(reader)
+        pd.testing.assert_frame_equal(reader.df, expected)
+        self.assertEqual((reader.rows, reader.cols), expected.shape)
+        return
+
+    def test_repeated_keys_raise_before_joining(self):
+        """Tests whether mapper keys repeated in the dump raise"""
+        self.segmapper.df.loc[3, 'sales_level_5'] = 'SL1'
+        reader = Mapped(self.dump.copy())
+        engine = HashMappingEngine(self.techmapper, self.segmapper, self.uniquenames)
+        with self.assertRaises(MappingRowsExceededException):
+            engine.map(reader)
+        return
+
+
+class LookupMappingEngineTest(unittest.TestCase):
+    """Unit test to run test cases on LookupMappingEngine class
+    """
+
+
+    def setUp(self):
+        """Initialization of LookupMappingEngineTest
+        """
+        self.engine = LookupMappingEngine(
+            Mapped(pd.DataFrame(), 'internal_sub_business_entity_name', 
+                Prepared('tech_spec1', [ 'internal_sub_business_entity_name', 'arch2' ])),
+            Mapped(pd.DataFrame(), 'sales_level_5', Prepared('sl5_to_segments', [ 'sales_level_5', 'rm_name' ])),
+            Mapped(pd.DataFrame(), 'customer_name', Prepared('master_unique_names', [ 'customer_name', 'acc_name' ])),
+        )
+
+    def _looked_up(self, tech_matches):
+        """Returns the dump as read through the lookups, with the matches of the technologies given"""
+        rows = len(tech_matches)
+        return Mapped(pd.DataFrame({
+            'internal_sub_business_entity_name' : [ 'ISBE{}'.format(row) for row in range(rows) ],
+            'sales_level_5'                     : [ 'SL' ] * rows,
+            'customer_name'                     : [ 'CUST' ] * rows,
+            'rm_name'                           : [ 'RM' ] * rows,
+            'acc_name'                          : [ 'ACC' ] * rows,
+            '_matches_tech_spec1'               : tech_matches,
+            '_matches_sl5_to_segments'          : [ 1 ] * rows,
+            '_matches_master_unique_names'      : [ 1 ] * rows,
+        }))
+
+    def test_unmatched_mapper_columns_are_added(self):
+        """Tests whether the columns no document has matched are added as nulls"""
+        reader = self._looked_up([ 1, 1 ])
+        self.engine.map(reader)
+        self.assertTrue(reader.df['arch2'].isnull().all())
+        self.assertNotIn('_matches_tech_spec1', reader.df.columns)
+        self.assertEqual((reader.rows, reader.cols), (2, 6))
+        return
+
+    def test_repeated_mapper_keys_raise(self):
+        """Tests whether a document multiplied by repeated mapper keys raises"""
+        reader = self._looked_up([ 2, 2, 1 ])
+        with self.assertRaises(MappingRowsExceededException) as ctx:
+            self.engine.map(reader)
+        self.assertEqual((ctx.exception.rows_bef, ctx.exception.rows_aft), (2, 3))
+        self.assertIn('arch2', reader.df.columns)
+        return
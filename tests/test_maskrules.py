@@ -0,0 +1,49 @@
+import unittest
+import numpy as np
+import pandas as pd
+from raptors.helpers.maskrules import MaskRules
+
+__author__ = "Jeyaraj Durairaj"
+__copyright__ = "Jeyaraj Durairaj"
+__license__ = "none"
+
+
+class MaskRulesTest(unittest.TestCase):
+    """Unit test to run test cases on MaskRules class
+    """
+
+
+    def setUp(self):
+        """Initialization of MaskRulesTest
+        """
+        self.df = pd.DataFrame({
+            'bookings_adjustments_type' : [ 'POS1', 'DSV', 'NEW', None ],
+            'no_of_days_past_ebd'       : [ -2, 0, np.nan, 7 ],
+            'past_due'                  : [ 'A', 'B', 'C', 'D' ],
+        })
+
+    def test_first_rule_holding_gives_the_value(self):
+        """Tests whether the rules are applied in order with the default"""
+        rules = MaskRules([
+            (MaskRules.startswith('bookings_adjustments_type', 'POS', 'DSV'), 'POS'),
+            (MaskRules.isin('bookings_adjustments_type', 'POS1', 'NEW'), 'OTHER'),
+        ], default='New Paper')
+        self.assertEqual(rules.derive(self.df, 'tier_code').tolist(), [ 'POS', 'POS', 'OTHER', 'New Paper' ])
+        return
+
+    def test_keep_defaults_to_the_current_value(self):
+        """Tests whether the unmatched rows keep the column's value"""
+        rules = MaskRules([
+            (MaskRules.less('no_of_days_past_ebd', 0), 'NEGATIVE'),
+            (MaskRules.greater_equal('no_of_days_past_ebd', 0), 'ZERO_AND_POSITIVE'),
+        ], keep=True)
+        self.assertEqual(rules.derive(self.df, 'past_due').tolist(), [ 'NEGATIVE', 'ZERO_AND_POSITIVE', 'C', 'ZERO_AND_POSITIVE' ])
+        return
+
+    def test_switch_keeps_the_rules_order(self):
+        """Tests whether the $switch expression follows the rules"""
+        rules  = MaskRules([ (MaskRules.equals('erp_deal_id', 0), 'Non Deal ID') ], default='Deal ID')
+        switch = rules.switch('deal_id_desc')['$switch']
+        self.assertEqual(switch['branches'], [ { 'case': { '$eq': [ '$erp_deal_id', 0 ] }, 'then': 'Non Deal ID' } ])
+        self.assertEqual(switch['default'], 'Deal ID')
+        return
@@ -0,0 +1,85 @@
+import unittest
+import numpy as np
+import pandas as pd
+from raptors.helpers.pandashelpers import DataFrameHelper
+
+__author__ = "Jeyaraj Durairaj"
+__copyright__ = "Jeyaraj Durairaj"
+__license__ = "none"
+
+
+class DataFrameHelperTest(unittest.TestCase):
+    """Unit test to run test cases on DataFrameHelper class
+    """
+
+
+    def setUp(self):
+        """Initialization of DataFrameHelperTest
+        """
+        self.helper    = DataFrameHelper()
+        self.helper.df = pd.DataFrame({
+            'customer_name'    : [ 'acme', 'Beta', 7, 'acme', 7 ],
+            'fiscal_period_id' : [ 201801, 201802, 201801, 201803, 201801 ],
+        })
+
+    def test_upcase_leaves_ints_as_they_are(self):
+        """Tests whether the mixed int/str column is upcased as before"""
+        self.helper.upcase_column('customer_name')
+        self.assertEqual(self.helper.df['customer_name'].tolist(), [ 'ACME', 'BETA', 7, 'ACME', 7 ])
+        return
+
+    def test_function_is_called_once_per_unique_value(self):
+        """Tests whether function mappers are memoized by unique value"""
+        calls  = []
+        mapper = lambda x: calls.append(x) or str(x)[-2:]
+        self.helper.make_new_column(mapper, 'fiscal_period_id', new_colname='fiscal_month_id')
+        self.assertEqual(self.helper.df['fiscal_month_id'].tolist(), [ '01', '02', '01', '03', '01' ])
+        self.assertEqual(sorted(calls), [ 201801, 201802, 201803 ])
+        return
+
+    def test_missing_values_are_mapped_as_they_are(self):
+        """Tests whether the missing values reach the function like Series.map"""
+        series = pd.Series([ 1, 2, np.nan, 2 ])
+        mapped = DataFrameHelper.map_uniques(series, lambda x: x * 10)
+        pd.testing.assert_series_equal(mapped, series.map(lambda x: x * 10))
+        return
+
+    def test_mixed_types_are_mapped_apart(self):
+        """Tests whether equal values of other types are not mapped as one"""
+        series = pd.Series([ 1, True, 'a', 1.0, 1, None ], dtype=object)
+        mapper = lambda x: type(x).__name__
+        mapped = DataFrameHelper.map_uniques(series, mapper)
+        self.assertEqual(mapped.tolist(), [ 'int', 'bool', 'str', 'float', 'int', 'NoneType' ])
+        pd.testing.assert_series_equal(mapped, series.map(mapper))
+        return
+
+    def test_string_columns_are_mapped_as_series_map(self):
+        """Tests whether object columns of strings with missing values map like Series.map"""
+        series = pd.Series([ 'acme', None, 'beta', 'acme', np.nan ], dtype=object)
+        mapper = lambda x: x.upper() if isinstance(x, str) else 'NONE'
+        pd.testing.assert_series_equal(DataFrameHelper.map_uniques(series, mapper), series.map(mapper))
+        return
+
+    def test_fingerprint_covers_all_the_columns(self):
+        """Tests whether a change in any column but the excluded ones changes the fingerprint"""
+        self.helper.df['timestamp'] = 1
+        self.helper.add_fingerprint()
+        hashes = self.helper.df['row_hash'].tolist()
+        self.helper.df['timestamp'] = 2
+        self.helper.add_fingerprint()
+        self.assertEqual(self.helper.df['row_hash'].tolist(), hashes)
+        self.helper.df.loc[1, 'customer_name'] = 'Gamma'
+        self.helper.add_fingerprint()
+        changed = [ old != new for old, new in zip(hashes, self.helper.df['row_hash'].tolist()) ]
+        self.assertEqual(changed, [ False, True, False, False, False ])
+        return
+
+    def test_fingerprint_does_not_depend_on_inferred_dtypes(self):
+        """Tests whether integral floats of untyped columns hash as the integers"""
+        self.helper.add_fingerprint()
+        hashes = self.helper.df['row_hash'].tolist()
+        self.helper.df['fiscal_period_id'] = self.helper.df['fiscal_period_id'].astype('float64')
+        self.helper.add_fingerprint()
+        self.assertEqual(self.helper.df['row_hash'].tolist(), hashes)
+        self.assertEqual(hashes[2], hashes[4])
+        return
@@ -0,0 +1,355 @@
+import os
+import shutil
+import tempfile
+import unittest
+import importlib.util
+import bson
+from openpyxl import Workbook
+import pandas as pd
+from raptors.models.readers import Reader, BookingDumpReader, MongoReader, CSVReader, ExcelReader
+from raptors.models.schemas import Schema
+
+__author__ = "Jeyaraj Durairaj"
+__copyright__ = "Jeyaraj Durairaj"
+__license__ = "none"
+
+
+class Client():
+    """MongoClient standing in for the one of the stored collection"""
+
+    append_metadata = None
+
+
+class Database():
+    """Database standing in for the one of the stored collection"""
+
+    client = Client()
+
+
+class Stored():
+    """Collection of documents standing in for a MongoDB collection in
+    the tests; the queries are ignored, all the documents match
+    """
+
+    codec_options = bson.CodecOptions()
+    database      = Database()
+
+
+    def __init__(self, docs):
+        """Initializer for Stored class"""
+        self.docs  = [ { '_id': bson.ObjectId(), **doc } for doc in docs ]
+        self.calls = []
+
+    def find(self, qry=None, projection=None, **kwargs):
+        """Returns the documents projected"""
+        self.calls.append('find')
+        return [ self._project(doc, projection) for doc in self.docs ]
+
+    def find_one(self, qry=None, projection=None, **kwargs):
+        """Returns the first document projected"""
+        return self._project(self.docs[0], projection) if self.docs else None
+
+    def aggregate(self, pipe, **kwargs):
+        """Returns the documents, taken as the output of the pipeline"""
+        self.calls.append('aggregate')
+        return [ self._project(doc, { '_id': 0 }) for doc in self.docs ]
+
+    def find_raw_batches(self, qry=None, projection=None, **kwargs):
+        """Returns the documents projected as one batch of BSON"""
+        self.calls.append('find_raw_batches')
+        return [ b''.join(bson.encode(self._project(doc, projection)) for doc in self.docs) ]
+
+    def aggregate_raw_batches(self, pipe, **kwargs):
+        """Returns the documents as one batch of BSON, keeping the pipeline"""
+        self.calls.append('aggregate_raw_batches')
+        self.pipe = pipe
+        return [ b''.join(bson.encode(self._project(doc, { '_id': 0 })) for doc in self.docs) ]
+
+    def _project(self, doc, projection):
+        """Returns the fields of the document kept by the projection"""
+        if not projection:
+            return dict(doc)
+        if any(keep for field, keep in projection.items() if field != '_id'):
+            return { field: val for field, val in doc.items()
+                    if projection.get(field, field == '_id' and projection.get('_id', 1)) }
+        return { field: val for field, val in doc.items() if projection.get(field, 1) }
+
+
+class Recorded():
+    """Reader engine standing in for MongoReader in the tests; records the
+    queries and returns the rows of the months asked for
+    """
+
+
+    def __init__(self, rows):
+        """Initializer for Recorded class"""
+        self.rows = rows
+        self.qrys = []
+
+    def read(self, qry, fields=None):
+        """Returns the rows whose month matches the query"""
+        self.qrys.append((qry, fields))
+        months = qry['fiscal_month_id']
+        months = months['$in'] if isinstance(months, dict) else [ months ]
+        return pd.DataFrame([ row for row in self.rows if row['fiscal_month_id'] in months ])
+
+
+class LoopedReadTest(unittest.TestCase):
+    """Unit test to run test cases on the looped reads of Reader class
+    """
+
+
+    def setUp(self):
+        """Initialization of LoopedReadTest
+        """
+        self.engine = Recorded([
+            { 'fiscal_month_id': 201801, 'booking_net': 1.0 },
+            { 'fiscal_month_id': 201802, 'booking_net': 2.0 },
+            { 'fiscal_month_id': 201802, 'booking_net': 3.0 },
+        ])
+        self.reader = Reader(self.engine)
+        self.qry    = { 'fiscal_year_id': 'FY18' }
+
+    def _loop(self, months, workers):
+        """Returns the loop params over the months"""
+        return { 'field': 'fiscal_month_id', 'params': months, 'workers': workers }
+
+    def test_one_worker_reads_by_one_in_query(self):
+        """Tests whether a single worker reads all the params by one '$in' query"""
+        self.reader.read(self.qry, loop_params=self._loop([ 201801, 201802 ], 1), fields=[ 'booking_net' ])
+        self.assertEqual(self.engine.qrys, [ ({ 'fiscal_year_id': 'FY18', 
+            'fiscal_month_id': { '$in': [ 201801, 201802 ] } }, [ 'booking_net' ]) ])
+        self.assertEqual(self.reader.df['booking_net'].tolist(), [ 1.0, 2.0, 3.0 ])
+        self.assertEqual(self.qry, { 'fiscal_year_id': 'FY18' })
+        return
+
+    def test_workers_read_by_one_query_per_param(self):
+        """Tests whether more workers read each param by its own query, concatenated in order"""
+        self.reader.read(self.qry, loop_params=self._loop([ 201802, 201803, 201801 ], 3))
+        self.assertEqual(sorted(qry['fiscal_month_id'] for qry, fields in self.engine.qrys), 
+            [ 201801, 201802, 201803 ])
+        self.assertTrue(all(qry['fiscal_year_id'] == 'FY18' for qry, fields in self.engine.qrys))
+        self.assertEqual(self.reader.df['booking_net'].tolist(), [ 2.0, 3.0, 1.0 ])
+        return
+
+    def test_no_rows_read_is_an_empty_frame(self):
+        """Tests whether the loop over params without any rows reads an empty dataframe"""
+        for workers in [ 1, 2 ]:
+            self.reader.read(self.qry, loop_params=self._loop([ 201812, 201811 ], workers))
+            self.assertTrue(self.reader.df.empty)
+        return
+
+
+@unittest.skipUnless(importlib.util.find_spec('pymongoarrow'), "'pymongoarrow' is not installed")
+class ArrowReadTest(unittest.TestCase):
+    """Unit test to run test cases on the Arrow reads of MongoReader class
+    """
+
+
+    def setUp(self):
+        """Initialization of ArrowReadTest
+        """
+        self.booking = [
+            { 'fiscal_period_id': 201801, 'arch2': 'SEC', 'booking_net': 10.5, 'erp_deal_id': 0 },
+            { 'fiscal_period_id': 201802, 'arch2': 'COLLAB', 'booking_net': 2, 'erp_deal_id': 'D-1' },
+        ]
+
+    def _reader(self, collname, docs):
+        """Returns the Arrow reader of the documents stored in the collection"""
+        reader      = MongoReader(collname, arrow=True)
+        reader.coll = Stored(docs)
+        return reader
+
+    def test_generate_reads_by_the_schema_of_the_output(self):
+        """Tests whether the 'booking_dump' aggregations are decoded by an explicit schema"""
+        reader  = self._reader('booking_dump', [ { key: val for key, val in doc.items() if key != 'erp_deal_id' }
+            for doc in self.booking ])
+        booking = BookingDumpReader(reader, workers=1)
+        booking.read([ [ { '$match': {} } ] ], fields=[ 'fiscal_period_id', 'arch2', 'booking_net' ])
+        self.assertEqual(reader.coll.calls, [ 'aggregate_raw_batches' ])
+        self.assertEqual(reader.coll.pipe[-1], { '$project': { '_id': False, 'fiscal_period_id': True,
+            'arch2': True, 'booking_net': True } })
+        self.assertEqual(booking.df['booking_net'].tolist(), [ 10.5, 2.0 ])
+        self.assertEqual(booking.df['fiscal_period_id'].tolist(), [ 201801, 201802 ])
+        return
+
+    def test_untyped_fields_are_joined(self):
+        """Tests whether the fields without a stored type are read apart and joined"""
+        reader = self._reader('ent_dump_from_finance', self.booking)
+        df     = reader.read({}, fields=[ 'fiscal_period_id', 'erp_deal_id' ])
+        self.assertIn('find_raw_batches', reader.coll.calls)
+        self.assertEqual(df['fiscal_period_id'].tolist(), [ 201801, 201802 ])
+        self.assertEqual(df['erp_deal_id'].tolist(), [ 0, 'D-1' ])
+        self.assertNotIn('_id', df.columns)
+        return
+
+    def test_whole_documents_are_read(self):
+        """Tests whether the reads without fields keep the untyped fields"""
+        reader = self._reader('ent_dump_from_finance', self.booking)
+        df     = reader.read({})
+        self.assertIn('find_raw_batches', reader.coll.calls)
+        self.assertEqual(sorted(df.columns), [ 'arch2', 'booking_net', 'erp_deal_id', 'fiscal_period_id' ])
+        self.assertEqual(df['arch2'].tolist(), [ 'SEC', 'COLLAB' ])
+        return
+
+    def test_values_of_other_types_are_decoded(self):
+        """Tests whether values not of the stored types fall back to decoding the documents"""
+        reader = self._reader('booking_dump', [ { 'arch2': 'SEC' }, { 'arch2': 7 } ])
+        df     = reader.read({}, fields=[ 'arch2' ])
+        self.assertEqual(reader.coll.calls, [ 'find_raw_batches', 'find' ])
+        self.assertEqual(df['arch2'].tolist(), [ 'SEC', 7 ])
+        return
+
+
+class Sampled():
+    """Collection standing in for a MongoDB collection in the tests;
+    every aggregation samples all of its documents
+    """
+
+
+    def __init__(self, docs):
+        """Initializer for Sampled class"""
+        self.docs  = docs
+        self.pipes = []
+
+    def aggregate(self, pipe, **kwargs):
+        """Returns all the documents, keeping the pipeline"""
+        self.pipes.append(pipe)
+        return list(self.docs)
+
+
+class PartitionRangesTest(unittest.TestCase):
+    """Unit test to run test cases on the partition ranges of MongoReader class
+    """
+
+
+    def _reader(self, docs, partitions=3, field='fiscal_period_id'):
+        """Returns the reader partitioning the sampled documents"""
+        reader      = MongoReader('booking_dump', partitions=partitions, partition_field=field)
+        reader.coll = Sampled(docs)
+        return reader
+
+    def test_ranges_are_split_by_sorted_samples(self):
+        """Tests whether the ranges are bounded by the sorted sample points, the first one open"""
+        reader = self._reader([ { 'fiscal_period_id': period } for period in [ 9, 3, 1, 7, 5, 2, 8, 4, 6 ] ])
+        ranges = reader._partition_ranges({ 'fiscal_year_id': 'FY18' })
+        self.assertEqual(ranges, [
+            { 'fiscal_period_id': { '$not': { '$gte': 4 } } },
+            { 'fiscal_period_id': { '$gte': 4, '$lt': 7 } },
+            { 'fiscal_period_id': { '$gte': 7 } },
+        ])
+        self.assertEqual(reader.coll.pipes[0][0], { '$match': { 'fiscal_year_id': 'FY18' } })
+        return
+
+    def test_repeated_points_are_merged(self):
+        """Tests whether the samples of one value make one point and no empty range"""
+        ranges = self._reader([ { 'fiscal_period_id': 201801 } ] * 6)._partition_ranges({})
+        self.assertEqual(ranges, [
+            { 'fiscal_period_id': { '$not': { '$gte': 201801 } } },
+            { 'fiscal_period_id': { '$gte': 201801 } },
+        ])
+        return
+
+    def test_values_of_other_types_are_not_points(self):
+        """Tests whether the strings, booleans and missing values are left to the first range"""
+        docs   = [ { 'fiscal_period_id': 'x' }, { 'fiscal_period_id': True }, {}, 
+            { 'fiscal_period_id': 10 }, { 'fiscal_period_id': 20.5 } ]
+        ranges = self._reader(docs, partitions=2)._partition_ranges({})
+        self.assertEqual(ranges, [
+            { 'fiscal_period_id': { '$not': { '$gte': 20.5 } } },
+            { 'fiscal_period_id': { '$gte': 20.5 } },
+        ])
+        return
+
+    def test_ids_are_split_by_sampled_ids(self):
+        """Tests whether the default partition field takes the sampled object ids"""
+        ids    = sorted(bson.ObjectId() for _ in range(4))
+        ranges = self._reader([ { '_id': _id } for _id in ids ], partitions=2, field='_id')._partition_ranges({})
+        self.assertEqual(ranges, [ { '_id': { '$not': { '$gte': ids[2] } } }, { '_id': { '$gte': ids[2] } } ])
+        return
+
+    def test_no_samples_is_one_range(self):
+        """Tests whether the collection without samples is read by one unbounded range"""
+        self.assertEqual(self._reader([])._partition_ranges({}), [ {} ])
+        return
+
+
+class ExcelReaderTest(unittest.TestCase):
+    """Unit test to run test cases on the chunked reads of ExcelReader class
+    """
+
+
+    def setUp(self):
+        """Initialization of ExcelReaderTest
+        """
+        self.tmpdir   = tempfile.mkdtemp()
+        self.filepath = os.path.join(self.tmpdir, 'booking.xlsx')
+        wb            = Workbook()
+        ws            = wb.active
+        ws.title      = 'Booking'
+        ws.append([ 'Customer_Name', 'Not_Needed', 'Booking_Net' ])
+        for row in [ [ 'A', 'x', 1 ], [ 'B', 'x', 2 ], [ None, None, None ], [ 'C', 'x', 3 ], [ 'D', 'x', 4 ], 
+                [ 'E', 'x', 5 ] ]:
+            ws.append(row)
+        wb.save(self.filepath)
+
+    def tearDown(self):
+        """Removes the temporary directory
+        """
+        shutil.rmtree(self.tmpdir)
+
+    def test_chunks_are_bounded(self):
+        """Tests whether the rows are yielded in chunks of at most 'chunksize' rows"""
+        chunks = list(ExcelReader(self.filepath, 'Booking', chunksize=2).read_chunks())
+        self.assertEqual([ chunk.shape[0] for chunk in chunks ], [ 2, 2, 1 ])
+        self.assertEqual(chunks[-1]['Customer_Name'].tolist(), [ 'E' ])
+        return
+
+    def test_blank_rows_are_skipped(self):
+        """Tests whether the rows without any value are not read"""
+        chunks = list(ExcelReader(self.filepath, 'Booking', chunksize=10).read_chunks())
+        self.assertEqual(len(chunks), 1)
+        self.assertEqual(chunks[0]['Customer_Name'].tolist(), [ 'A', 'B', 'C', 'D', 'E' ])
+        self.assertEqual(chunks[0]['Booking_Net'].tolist(), [ 1, 2, 3, 4, 5 ])
+        return
+
+    def test_dropped_columns_are_not_read(self):
+        """Tests whether the dropped columns are filtered out by their names in any case"""
+        reader = ExcelReader(self.filepath, None, chunksize=10, dropcols=[ 'not_needed' ])
+        chunks = list(reader.read_chunks())
+        self.assertEqual(chunks[0].columns.tolist(), [ 'Customer_Name', 'Booking_Net' ])
+        return
+
+
+class CSVReaderTest(unittest.TestCase):
+    """Unit test to run test cases on CSVReader class
+    """
+
+
+    def setUp(self):
+        """Initialization of CSVReaderTest
+        """
+        self.tmpdir   = tempfile.mkdtemp()
+        self.filepath = os.path.join(self.tmpdir, 'booking.csv')
+        self.schema   = Schema({ 'opportunity_id': 'str', 'fiscal_week_id': 'int32', 'booking_net': 'float64' })
+        with open(self.filepath, 'w') as csvfile:
+            csvfile.write('Opportunity_ID,Fiscal_Week_ID,Booking_Net\n')
+            csvfile.write('00123,2018011,1.5\n00124,2018012,x\n00125,,2\n')
+
+    def tearDown(self):
+        """Removes the temporary directory
+        """
+        shutil.rmtree(self.tmpdir)
+
+    def test_values_which_are_not_numbers_are_filled(self):
+        """Tests whether a bad numeric cell is filled instead of failing the read"""
+        dtypes = self.schema.csv_dtypes(CSVReader.read_header(self.filepath))
+        df     = CSVReader(self.filepath, chunksize=2, dtypes=dtypes, schema=self.schema).read()
+        self.assertEqual(df['Booking_Net'].tolist(), [ 1.5, 0.0, 2.0 ])
+        self.assertEqual(df['Fiscal_Week_ID'].tolist(), [ 2018011, 2018012, 0 ])
+        self.assertEqual(df['Opportunity_ID'].tolist(), [ '00123', '00124', '00125' ])
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+import numpy as np
+import pandas as pd
+from raptors.models.schemas import Schema, SchemaRegistry
+
+__author__ = "Jeyaraj Durairaj"
+__copyright__ = "Jeyaraj Durairaj"
+__license__ = "none"
+
+
+class SchemaTest(unittest.TestCase):
+    """Unit test to run test cases on Schema class
+    """
+
+
+    def setUp(self):
+        """Initialization of SchemaTest
+        """
+        self.schema = Schema({ 'opportunity_id': 'str', 'fiscal_week_id': 'int32', 'booking_net': 'float64' })
+        self.df     = pd.DataFrame({
+            'Opportunity_ID' : [ 123.0, np.nan ],
+            'Fiscal_Week_ID' : [ 2018011, np.nan ],
+            'Booking_Net'    : [ 1.5, np.nan ],
+            'Undeclared'     : [ 'x', np.nan ],
+        })
+
+    def test_declared_columns_are_cast(self):
+        """Tests whether declared columns get their dtypes case-insensitively"""
+        self.schema.coerce(self.df)
+        self.assertEqual(self.df['Fiscal_Week_ID'].dtype, np.dtype('int32'))
+        self.assertEqual(self.df['Booking_Net'].dtype, np.dtype('float64'))
+        self.assertEqual(self.df['Opportunity_ID'].tolist(), [ '123', '' ])
+        return
+
+    def test_numeric_columns_are_filled_with_zero(self):
+        """Tests whether numeric columns are filled with the default fill value"""
+        self.schema.coerce(self.df)
+        self.assertEqual(self.df['Fiscal_Week_ID'].tolist(), [ 2018011, 0 ])
+        return
+
+    def test_undeclared_columns_are_untouched(self):
+        """Tests whether undeclared columns are left for fill_notapplicables"""
+        self.schema.coerce(self.df)
+        self.assertTrue(pd.isnull(self.df.loc[1, 'Undeclared']))
+        self.assertEqual(list(self.schema.fills_for(self.df.columns)), [ 'Opportunity_ID', 'Fiscal_Week_ID', 'Booking_Net' ])
+        return
+
+    def test_resolve_declares_renamed_source_columns(self):
+        """Tests whether source columns renamed into declared ones are declared"""
+        schema = self.schema.resolve({ 'Fiscal Week': 'fiscal_week_id' })
+        self.assertEqual(schema.dtypes['fiscal week'], 'int32')
+        return
+
+    def test_registry_knows_sensitive_collections(self):
+        """Tests whether the dump collections are registered"""
+        self.assertIsNotNone(SchemaRegistry.get('ent_dump_from_finance'))
+        self.assertIsNotNone(SchemaRegistry.get('sfdc_raw_dump'))
+        self.assertIsNone(SchemaRegistry.get('master_unique_names'))
+        return
+
+    def test_csv_dtypes_declare_the_string_columns(self):
+        """Tests whether the CSV dtypes cover the declared string columns only"""
+        dtypes = self.schema.csv_dtypes(self.df.columns)
+        self.assertEqual(dtypes, { 'Opportunity_ID': str })
+        return
+
+    def test_values_which_are_not_numbers_are_filled(self):
+        """Tests whether numeric columns fill the values which are not numbers"""
+        df = pd.DataFrame({ 'Booking_Net': [ '1.5', 'n/a', np.nan ] })
+        self.schema.coerce(df)
+        self.assertEqual(df['Booking_Net'].tolist(), [ 1.5, 0.0, 0.0 ])
+        return
+
+    def test_deal_ids_are_not_coerced(self):
+        """Tests whether the deal ids are left as read, not turned into numbers"""
+        self.assertNotIn('erp_deal_id', SchemaRegistry.get('ent_dump_from_finance').dtypes)
+        return
@@ -1,4 +1,6 @@
 import unittest
+import numpy as np
+import pandas as pd
 from raptors.controllers.sync import Sync
 
 __author__ = "Jeyaraj Durairaj"
@@ -55,3 +57,35 @@ class SyncTest(unittest.TestCase):
         self.assertTrue(len(self.sync2.trash_query.keys()) == 0)
         self.assertTrue(len(self.sync3.trash_query.keys()) == 0)
         return
+
+
+class DiffFingerprintsTest(unittest.TestCase):
+    """Unit test to run test cases on the fingerprint diff of Sync class
+    """
+
+
+    def _diff(self, new, stored):
+        """Returns the lists of the rows to insert and the documents to remove"""
+        to_insert, to_trash = Sync._diff_fingerprints(pd.Series(new, dtype='int64'), pd.Series(stored, dtype=object))
+        return to_insert.tolist(), to_trash.tolist()
+
+    def test_unchanged_rows_are_kept(self):
+        """Tests whether the stored fingerprints of the file are neither inserted nor removed"""
+        self.assertEqual(self._diff([ 1, 2, 3 ], [ 3, 1, 2 ]), ([ False ] * 3, [ False ] * 3))
+        return
+
+    def test_inserts_and_removals(self):
+        """Tests whether new fingerprints are inserted and missing ones removed"""
+        self.assertEqual(self._diff([ 1, 4 ], [ 1, 2 ]), ([ False, True ], [ False, True ]))
+        return
+
+    def test_duplicates_are_matched_one_to_one(self):
+        """Tests whether duplicate rows are inserted or removed by their count"""
+        self.assertEqual(self._diff([ 5, 5, 5 ], [ 5 ]), ([ False, True, True ], [ False ]))
+        self.assertEqual(self._diff([ 5 ], [ 5, 5 ]), ([ False ], [ False, True ]))
+        return
+
+    def test_documents_without_fingerprint_are_removed(self):
+        """Tests whether legacy documents without 'row_hash' are replaced"""
+        self.assertEqual(self._diff([ 1, 2 ], [ 1, np.nan, None ]), ([ False, True ], [ False, True, True ]))
+        return
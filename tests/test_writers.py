@@ -0,0 +1,193 @@
+import unittest
+import pandas as pd
+from pymongo.errors import OperationFailure, BulkWriteError
+from raptors.models.writers import MongoWriter
+
+__author__ = "Jeyaraj Durairaj"
+__copyright__ = "Jeyaraj Durairaj"
+__license__ = "none"
+
+
+class Found():
+    """Cursor standing in for the pymongo one in the tests"""
+
+
+    def __init__(self, docs):
+        """Initializer for Found class"""
+        self.docs = docs
+
+    def count(self):
+        """Returns the number of documents found"""
+        return len(self.docs)
+
+
+class Stored():
+    """Collection standing in for a MongoDB collection in the tests;
+    like MongoDB, it exists once created or written into
+    """
+
+
+    def __init__(self, db, name):
+        """Initializer for Stored class"""
+        self.db      = db
+        self.name    = name
+        self.docs    = []
+        self.indexes = { '_id_': { 'key': [ ('_id', 1) ] } }
+
+    def insert_many(self, docs, ordered=True):
+        """Stores the documents"""
+        self.db.created[self.name] = self
+        self.docs.extend(docs)
+        return
+
+    def find(self, qry=None, projection=None):
+        """Returns all the documents, the queries are ignored"""
+        return Found(self.docs)
+
+    def index_information(self):
+        """Returns the indexes of the collection"""
+        return dict(self.indexes)
+
+    def create_index(self, keys, **kwargs):
+        """Creates the index and returns its name"""
+        name = kwargs.get('name', '_'.join("{}_{}".format(field, direction) for field, direction in keys))
+        self.indexes[name] = { 'key': list(keys) }
+        return name
+
+    def rename(self, new_name, dropTarget=False):
+        """Renames the collection, failing as MongoDB does when it does not exist"""
+        if self.db.created.get(self.name) is not self:
+            raise OperationFailure("source namespace does not exist", code=26)
+        self.db.created[new_name] = self.db.created.pop(self.name)
+        self.name = new_name
+        return
+
+
+class Database():
+    """Database standing in for a MongoDB database in the tests"""
+
+
+    def __init__(self):
+        """Initializer for Database class"""
+        self.created = {}
+
+    def __getitem__(self, name):
+        """Returns the collection, existing or not"""
+        return self.created.get(name, Stored(self, name))
+
+    def create_collection(self, name):
+        """Creates the collection"""
+        self.created[name] = Stored(self, name)
+        return self.created[name]
+
+    def drop_collection(self, name):
+        """Drops the collection"""
+        self.created.pop(name, None)
+        return
+
+
+class StagedWriteTest(unittest.TestCase):
+    """Unit test to run test cases on the staged writes of MongoWriter class
+    """
+
+
+    def setUp(self):
+        """Initialization of StagedWriteTest
+        """
+        self.writer      = MongoWriter('ccsdm', 'booking_dump_summary', count=False, staged=True)
+        self.writer.db   = Database()
+        self.writer.coll = self.writer.db['booking_dump_summary']
+
+    def test_staged_rows_replace_the_target(self):
+        """Tests whether the staging collection is swapped in place of the target"""
+        self.writer.db.create_collection('booking_dump_summary').insert_many([ { 'old': 1 } ])
+        self.writer.stage()
+        self.writer.write(pd.DataFrame({ 'new': [ 1, 2 ] }))
+        self.writer.promote()
+        self.assertEqual(self.writer.db.created['booking_dump_summary'].docs, [ { 'new': 1 }, { 'new': 2 } ])
+        self.assertNotIn('booking_dump_summary_staging', self.writer.db.created)
+        return
+
+    def test_empty_frame_empties_the_target(self):
+        """Tests whether promoting an empty staging collection leaves the target empty"""
+        self.writer.db.create_collection('booking_dump_summary').insert_many([ { 'old': 1 } ])
+        self.writer.stage()
+        self.writer.write(pd.DataFrame())
+        self.writer.promote()
+        self.assertEqual(self.writer.db.created['booking_dump_summary'].docs, [])
+        return
+
+
+class Failing():
+    """Collection failing the inserts as told, standing in for a MongoDB
+    collection in the tests
+    """
+
+
+    def __init__(self, *failures):
+        """Initializer for Failing class"""
+        self.failures = list(failures)
+        self.inserted = []
+
+    def insert_many(self, docs, ordered=True):
+        """Raises the next failure, or stores the documents"""
+        if self.failures:
+            raise self.failures.pop(0)
+        self.inserted.append([ dict(doc) for doc in docs ])
+        return
+
+
+class BatchWriteTest(unittest.TestCase):
+    """Unit test to run test cases on the batched writes of MongoWriter class
+    """
+
+
+    def setUp(self):
+        """Initialization of BatchWriteTest
+        """
+        self.writer = MongoWriter('ccsdm', 'booking_dump', count=False)
+        self.fast   = self.writer.target_latency / 4
+        self.slow   = self.writer.target_latency * 2
+
+    def _duplicates(self, code=11000):
+        """Returns the bulk write error of duplicate keys, or of another code"""
+        return BulkWriteError({ 'writeErrors': [ { 'index': 0, 'code': code } ], 'writeConcernErrors': [] })
+
+    def test_batch_grows_while_round_trips_are_cheap(self):
+        """Tests whether full batches sent fast double the batch size, up to the maximum"""
+        self.assertEqual(self.writer._adapt_batchsize(1000, 1000, self.fast), 2000)
+        self.assertEqual(self.writer._adapt_batchsize(self.writer.max_batchsize, self.writer.max_batchsize, 
+            self.fast), self.writer.max_batchsize)
+        self.assertEqual(self.writer._adapt_batchsize(1000, 10, self.fast), 1000)
+        return
+
+    def test_batch_shrinks_when_round_trips_are_slow(self):
+        """Tests whether slow batches halve the batch size, down to the minimum"""
+        self.assertEqual(self.writer._adapt_batchsize(1000, 1000, self.slow), 500)
+        self.assertEqual(self.writer._adapt_batchsize(self.writer.min_batchsize, self.writer.min_batchsize, 
+            self.slow), self.writer.min_batchsize)
+        return
+
+    def test_overflowing_ids_are_stringified(self):
+        """Tests whether a batch failing with too big integers is retried with them as strings"""
+        coll = Failing(OverflowError())
+        self.writer._insert_batch(coll, [ { 'opportunity_id': 2**64 }, { 'opportunity_id': 7 } ])
+        self.assertEqual(coll.inserted, [ [ { 'opportunity_id': str(2**64) }, { 'opportunity_id': 7 } ] ])
+        return
+
+    def test_retry_tolerates_duplicate_keys(self):
+        """Tests whether the documents already sent by the failed batch are not reported"""
+        coll = Failing(self._duplicates())
+        self.writer._retry_batch(coll, [ { 'opportunity_id': 2**64 } ])
+        return
+
+    def test_retry_raises_other_errors(self):
+        """Tests whether the retry raises the errors other than duplicate keys"""
+        coll = Failing(self._duplicates(code=121))
+        with self.assertRaises(BulkWriteError):
+            self.writer._retry_batch(coll, [ { 'opportunity_id': 2**64 } ])
+        return
+
+
+if __name__ == '__main__':
+    unittest.main()